@@ -1,4 +1,11 @@
+import sys
+from typing import Any, Iterator
+
 from langchain.agents import create_agent
+from langchain.agents.middleware import ModelResponse, wrap_model_call
+from langchain.agents.structured_output import ProviderStrategy, StructuredOutputValidationError
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessageChunk
 from langchain_openai import ChatOpenAI
 from langchain_tavily import TavilySearch
 
@@ -6,16 +13,49 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from schemas import AgentResponse
+from response_stream import AgentResponseStreamParser, fallback_agent_response
 tools = [TavilySearch()]
 
+class LLMCallCounter(BaseCallbackHandler):
+    """Counts how many times the model is called during one agent run."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def on_chat_model_start(self, serialized: dict, messages: list, **kwargs: Any) -> None:
+        self.calls += 1
+
+    def on_llm_start(self, serialized: dict, prompts: list, **kwargs: Any) -> None:
+        self.calls += 1
+
+@wrap_model_call
+def structured_output_fallback(request, handler) -> ModelResponse:
+    """Repairs an invalid structured answer locally instead of asking the model again."""
+    try:
+        return handler(request)
+    except StructuredOutputValidationError as error:
+        return ModelResponse(
+            result=[error.ai_message],
+            # fallback_agent_response (response_stream.py) also repairs the streamed answer
+            structured_response=fallback_agent_response(error.ai_message.text),
+        )
+
 llm = ChatOpenAI(model="gpt-4o")
 agent = create_agent(
     model=llm,
     tools=tools,
-    response_format=AgentResponse,
+    # ProviderStrategy: the model writes the AgentResponse JSON in the same turn where it stops
+    # calling tools. There is no extra "format your answer" call and no extra tool round trip.
+    # The schema is sent as OpenAI's json_schema response format WITHOUT strict mode (strict needs
+    # every field required, and 'sources' has a default), so it is a hint the model usually follows,
+    # not a guarantee; structured_output_fallback below repairs the answers that don't match.
+    response_format=ProviderStrategy(AgentResponse),
+    middleware=[structured_output_fallback],
 )
 
 def main():
+    # The counter is passed per run, so concurrent runs don't mix up their counts
+    llm_calls = LLMCallCounter()
     result = agent.invoke(
         {
             "messages": [
@@ -24,11 +64,67 @@ def main():
                     "content": "search for 3 job postings for an ai engineer using langchain in the bay area on linkedin and list their details",
                 }
             ]
-        }
+        },
+        config={"callbacks": [llm_calls]},
     )
     # Access structured response from the agent
     structured = result.get("structured_response", None)
     print(structured if structured is not None else result)
+    print(f"LLM calls for this run: {llm_calls.calls}")
+
+def stream_agent_response(query: str) -> Iterator[AgentResponse]:
+    """Yields progressively filled AgentResponse objects while the final answer is generated.
+
+    With gpt-4o the structured response arrives as JSON in the message content; models without
+    native structured output send it as the arguments of an 'AgentResponse' tool call instead.
+    """
+    parsers = {}  # one parser per AI message, earlier turns are tool calls / search steps
+    structured_calls = set()  # (message id, tool call index) of 'AgentResponse' tool calls
+    parser = None
+    structured = None  # the graph's own structured_response, set once the agent is done
+    for mode, data in agent.stream(
+        {"messages": [{"role": "user", "content": query}]},
+        stream_mode=["messages", "values"],
+    ):
+        if mode == "values":
+            structured = data.get("structured_response", structured)
+            continue
+        message, _metadata = data
+        if not isinstance(message, AIMessageChunk):
+            continue
+        parser = parsers.setdefault(message.id, AgentResponseStreamParser())
+
+        text = message.content if isinstance(message.content, str) else ""
+        for tool_call_chunk in message.tool_call_chunks:
+            call = (message.id, tool_call_chunk.get("index"))
+            if tool_call_chunk.get("name") == AgentResponse.__name__:
+                structured_calls.add(call)
+            if call in structured_calls:
+                text += tool_call_chunk.get("args") or ""
+
+        snapshot = parser.feed(text) if text else None
+        if snapshot is not None:
+            yield snapshot
+
+    # The final, fully validated response: the agent's own one (already repaired by
+    # structured_output_fallback if needed), else the parsed stream, which falls back the same way
+    if structured is not None:
+        yield structured
+    elif parser is not None:
+        yield parser.result()
+
+def stream_main():
+    partial = None
+    for partial in stream_agent_response(
+        "search for 3 job postings for an ai engineer using langchain in the bay area on linkedin and list their details"
+    ):
+        print(f"\r{partial.answer[-80:]!r} ({len(partial.sources)} sources)", end="", flush=True)
+    print()
+    print(partial)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python 1-CodeForStructuredOutputAndPydantic.py --stream  shows the answer while it is written
+    if "--stream" in sys.argv:
+        stream_main()
+    else:
+        main()
\ No newline at end of file
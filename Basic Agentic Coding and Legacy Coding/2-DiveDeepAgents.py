@@ -1,3 +1,5 @@
+import io
+import re
 from dotenv import load_dotenv
 from langchain.tools import tool
 from langchain_core.tools import Tool
@@ -7,7 +9,9 @@ from langchain_openai import ChatOpenAI
 # ReActSingleInputOutputParser is now in langchain_classic to maintain stable legacy logic
 from langchain_classic.agents.output_parsers import ReActSingleInputOutputParser
 from langchain_core.agents import AgentAction, AgentFinish
-from typing import Union, List
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable, RunnableLambda
+from typing import Optional, Union, List
 
 load_dotenv()
 
@@ -42,13 +46,9 @@ def format_log_to_str(
         thoughts+= f"\n{observation_prefix}{observation}\n{llm_prefix}"
     return thoughts
 
-if __name__ == '__main__':
-    print("Hello reAct LangChain!!")
-    tools = [get_text_length]
-
-    # This template defines the 'Reasoning' framework (ReAct).
-    # It forces the LLM to write its thoughts before taking an action.
-    template = """
+# This template defines the 'Reasoning' framework (ReAct).
+# It forces the LLM to write its thoughts before taking an action.
+template = """
     Answer the following questions as best you can. You have access to the following tools:
 
     {tools}
@@ -60,7 +60,7 @@ if __name__ == '__main__':
     Action: the action to take, should be one of [{tool_names}]
     Action Input: the input to the action
     Observation: the result of the action
-    ... (this Thought/Action/Action Input/Observation can repeat 1 time)
+    ... (this Thought/Action/Action Input/Observation can repeat N times)
     Thought: I now know the final answer
     Final Answer: the final answer to the original input question
 
@@ -70,6 +70,214 @@ if __name__ == '__main__':
     Thought:{agent_scratchpad}
     """
 
+class ReActScratchpad:
+    """The rendered ReAct prompt for one question, grown one step at a time.
+
+    format_log_to_str() re-renders every previous step on every call, so a run with N steps
+    does O(N^2) work. Here the template is rendered once and each step only appends its own
+    Thought/Action/Observation text.
+    """
+
+    # Placeholder used to split the rendered template around {agent_scratchpad}
+    _MARKER = "\x00agent_scratchpad\x00"
+
+    def __init__(
+            self,
+            prompt: PromptTemplate,
+            question: str,
+            observation_prefix: str = "Observation: ",
+            llm_prefix: str = "Thought: "
+    ):
+        rendered = prompt.format(input=question, agent_scratchpad=self._MARKER)
+        head, self._tail = rendered.split(self._MARKER)
+        # StringIO appends in place, instead of copying the whole prompt for every new step
+        self._buffer = io.StringIO()
+        self._buffer.write(head)
+        self.observation_prefix = observation_prefix
+        self.llm_prefix = llm_prefix
+        self.intermediate_steps: List[tuple[AgentAction, str]] = []
+
+    def add_step(self, action: AgentAction, observation: str) -> None:
+        self.intermediate_steps.append((action, observation))
+        self._buffer.write(action.log)
+        self._buffer.write(f"\n{self.observation_prefix}{observation}\n{self.llm_prefix}")
+
+    def to_prompt(self) -> str:
+        return self._buffer.getvalue() + self._tail
+
+def run_tool(tools: List[Tool], agent_step: AgentAction) -> str:
+    """Execute the tool the LLM asked for and return its observation."""
+    tool_to_use = find_tool_by_name(tools, agent_step.tool)
+    return str(tool_to_use.func(str(agent_step.tool_input)))
+
+# Mirrors what AgentExecutor returns when it runs out of iterations
+def stopped_early(max_steps: int) -> AgentFinish:
+    return AgentFinish(
+        return_values={"output": f"Agent stopped after reaching the limit of {max_steps} steps."},
+        log=""
+    )
+
+def run_react_agent(
+        agent: Runnable,
+        prompt: PromptTemplate,
+        tools: List[Tool],
+        question: str,
+        max_steps: int = 5
+) -> AgentFinish:
+    """Run the Thought -> Action -> Observation loop until the agent gives a Final Answer.
+
+    param agent: llm | ReActSingleInputOutputParser(), it receives the rendered prompt string
+    param max_steps: maximum number of LLM calls before giving up
+    """
+    scratchpad = ReActScratchpad(prompt, question)
+    for _ in range(max_steps):
+        agent_step: Union[AgentAction, AgentFinish] = agent.invoke(scratchpad.to_prompt())
+        if isinstance(agent_step, AgentFinish):
+            return agent_step
+        scratchpad.add_step(agent_step, run_tool(tools, agent_step))
+    return stopped_early(max_steps)
+
+def run_react_agent_batch(
+        agent: Runnable,
+        prompt: PromptTemplate,
+        tools: List[Tool],
+        questions: List[str],
+        max_steps: int = 5,
+        max_concurrency: int = 8
+) -> List[AgentFinish]:
+    """Run many questions together: every round sends one .batch() call for all unfinished agents."""
+    scratchpads = [ReActScratchpad(prompt, question) for question in questions]
+    results: List[Union[AgentFinish, None]] = [None] * len(questions)
+    active = list(range(len(questions)))
+
+    for _ in range(max_steps):
+        if not active:
+            break
+        agent_steps = agent.batch(
+            [scratchpads[i].to_prompt() for i in active],
+            config={"max_concurrency": max_concurrency}
+        )
+        still_active = []
+        for i, agent_step in zip(active, agent_steps):
+            if isinstance(agent_step, AgentFinish):
+                results[i] = agent_step
+            else:
+                scratchpads[i].add_step(agent_step, run_tool(tools, agent_step))
+                still_active.append(i)
+        active = still_active
+
+    for i in active:
+        results[i] = stopped_early(max_steps)
+    return results
+
+class StreamingReActParser:
+    """Parses the ReAct text while it is still being streamed.
+
+    feed() returns an AgentAction once the 'Action Input:' value is complete, or an
+    AgentFinish once the 'Final Answer:' is followed by text that is no longer part of it.
+    An Action Input is complete at a line break where its brackets and double quotes are
+    balanced (so a multi-line JSON input is read to its end), or at an Observation/Thought/
+    Question line. Up to that point the result is the same as parsing the completed text,
+    which is delegated to ReActSingleInputOutputParser. feed() only looks at new text, so
+    parsing the whole stream costs O(length of the output).
+    """
+
+    ACTION_INPUT = re.compile(r"Action\s*\d*\s*Input\s*\d*\s*:")
+    FINAL_ANSWER = "Final Answer:"
+    # What models that ignore the stop sequences write after a finished answer or action
+    END_MARKERS = ("\nObservation", "\nQuestion:", "\nThought:")
+    # A marker can be split over two tokens, so searches restart this far before the new text
+    LOOKBACK = 32
+
+    def __init__(self):
+        self.text = ""
+        self._parser = ReActSingleInputOutputParser()
+        self._scanned = 0  # the text before this offset was already searched
+        self._answer_start: Optional[int] = None  # end of "Final Answer:"
+        self._input_start: Optional[int] = None  # end of "Action Input:"
+        # Bracket/string state of the Action Input value, updated one new character at a time
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._has_value = False
+
+    def feed(self, token: str) -> Optional[Union[AgentAction, AgentFinish]]:
+        self.text += token
+        search_from = max(0, self._scanned - self.LOOKBACK)
+        new_from = self._scanned
+        self._scanned = len(self.text)
+
+        if self._answer_start is None:
+            answer = self.text.find(self.FINAL_ANSWER, search_from)
+            if answer != -1:
+                self._answer_start = answer + len(self.FINAL_ANSWER)
+        if self._answer_start is not None:
+            end = self._find_end_marker(max(search_from, self._answer_start))
+            return self._parser.parse(self.text[:end]) if end is not None else None
+
+        if self._input_start is None:
+            action_input = self.ACTION_INPUT.search(self.text, search_from)
+            if action_input is None:
+                return None
+            self._input_start = new_from = action_input.end()
+
+        # Cut at the first line break outside brackets and strings...
+        for i in range(max(new_from, self._input_start), len(self.text)):
+            char = self.text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[(":
+                self._depth += 1
+            elif char in "}])":
+                self._depth = max(0, self._depth - 1)
+            elif char == "\n" and self._depth == 0 and self._has_value:
+                return self._parser.parse(self.text[:i])
+            if not char.isspace():
+                self._has_value = True
+
+        # ...or, for unbalanced input, at the next Observation/Thought/Question line
+        end = self._find_end_marker(max(search_from, self._input_start))
+        return self._parser.parse(self.text[:end]) if end is not None else None
+
+    def _find_end_marker(self, start: int) -> Optional[int]:
+        ends = [end for end in (self.text.find(marker, start) for marker in self.END_MARKERS) if end != -1]
+        return min(ends) if ends else None
+
+    def finish(self) -> Union[AgentAction, AgentFinish]:
+        """The stream ended (e.g. on a stop sequence): parse whatever was generated."""
+        return self._parser.parse(self.text)
+
+def stream_react_step(llm: BaseChatModel, prompt_text: str) -> Union[AgentAction, AgentFinish]:
+    """One agent step that stops reading the LLM as soon as the step is complete."""
+    parser = StreamingReActParser()
+    stream = llm.stream(prompt_text)
+    try:
+        for chunk in stream:
+            agent_step = parser.feed(chunk.content if isinstance(chunk.content, str) else "")
+            if agent_step is not None:
+                return agent_step
+    finally:
+        # Closing the generator closes the HTTP stream, which cancels the rest of the generation.
+        # LangChain reports the close to callbacks as on_llm_error(GeneratorExit) with the text
+        # generated so far; TracingCallbackHandler records that as a finished, cancelled run.
+        stream.close()
+    return parser.finish()
+
+def create_streaming_agent(llm: BaseChatModel) -> Runnable:
+    """Drop-in replacement for llm | ReActSingleInputOutputParser() that parses while streaming."""
+    return RunnableLambda(lambda prompt_text: stream_react_step(llm, prompt_text))
+
+if __name__ == '__main__':
+    print("Hello reAct LangChain!!")
+    tools = [get_text_length]
+
     # .partial() fills in the tool-related variables immediately so the LLM knows its 'capabilities'.
     prompt = PromptTemplate.from_template(template=template).partial(
         tools=render_text_description(tools), 
@@ -84,42 +292,24 @@ if __name__ == '__main__':
         model='gpt-4o', 
         model_kwargs={"stop": ["\nObservation", "Observation:"]}
     )
-    intermediate_steps=[]
 
     # THE AGENT CHAIN:
-    # 1. Takes 'input' string.
-    # 2. Formats the ReAct prompt.
-    # 3. LLM generates the "Thought" and "Action".
-    # 4. Parser turns that text into an AgentAction or AgentFinish object.
-    agent = (
-        {
-            "input": lambda x: x['input'],
-            "agent_scratchpad": lambda x: format_log_to_str(x['agent_scratchpad'])
-        } 
-    | prompt 
-    | llm 
-    | ReActSingleInputOutputParser()
-    )
+    # 1. Takes the rendered prompt string (built by ReActScratchpad).
+    # 2. LLM generates the "Thought" and "Action".
+    # 3. The text is parsed into an AgentAction or AgentFinish object while it streams,
+    #    and the request is cancelled as soon as the Action Input (or Final Answer) is complete.
+    #    This also protects us from models that ignore the stop sequences and invent their own Observation.
+    #    (Without streaming this would be: agent = llm | ReActSingleInputOutputParser())
+    agent = create_streaming_agent(llm)
 
-    # Step 1: The agent reasons and decides which tool to use.
-    agent_step: Union[AgentAction, AgentFinish] = agent.invoke({"input": "What is the length of the text 'Hello, world!'?",
-                                                                "agent_scratchpad": intermediate_steps})
-    
-    print(agent_step)
-    
-    # agent_step.log contains the full 'Thought' and 'Action' text from the LLM.
-    print(agent_step.log)
-
-    # If the parser returned an 'AgentAction', it means the LLM wants to use a tool.
-    if isinstance(agent_step, AgentAction):
-        tool_name = agent_step.tool
-        tool_to_use = find_tool_by_name(tools, tool_name)
-        tool_input = agent_step.tool_input
-
-        # We manually execute the tool function.
-        observation = tool_to_use.func(str(tool_input))
-        
-        # We print the result, which in a real loop would be fed back into the LLM 
-        # for its next 'Thought' step.
-        print(f'Observation: {observation}')
-        intermediate_steps.append((agent_step,observation))
\ No newline at end of file
+    # THE AGENT LOOP: reason -> run the tool -> feed the Observation back, until a Final Answer.
+    result = run_react_agent(agent, prompt, tools, "What is the length of the text 'Hello, world!'?", max_steps=5)
+    print(result.return_values["output"])
+
+    # Many questions at once: each round is a single .batch() call for all unfinished agents.
+    results = run_react_agent_batch(
+        agent, prompt, tools,
+        ["What is the length of the text 'DOG'?", "What is the length of the text 'LangChain'?"]
+    )
+    for finish in results:
+        print(finish.return_values["output"])
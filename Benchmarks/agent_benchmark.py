@@ -0,0 +1,283 @@
+"""
+Offline benchmark of the four ways this repo runs a tool-using agent:
+
+1. agent_executor   -> AgentExecutor + create_tool_calling_agent   (Tool Calling/3-ToolCallingDemo.py)
+2. bind_tools_loop  -> manual .bind_tools() while-loop             (Tool Calling/4.ToolCallingLatest.py)
+   bind_tools_streaming -> the same loop with streaming tool dispatch
+3. create_agent     -> create_agent + ProviderStrategy(AgentResponse) + fallback middleware
+                       (Basic Agentic Coding and Legacy Coding/1-...py)
+4. state_graph      -> StateGraph ReAct loop                          (Langraph Intro/main6.py)
+
+Every path talks to the same ScriptedChatModel and fake tools (fakes.py), so there is
+no network and every run does exactly the same work: `--steps` tool calls + a final answer.
+
+Usage:
+    python Benchmarks/agent_benchmark.py --steps 3 --output bench_agents.json
+"""
+import argparse
+import importlib.metadata
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "Tool Calling"))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+from fakes import ScriptedChatModel, make_fake_tool
+from schemas import AgentResponse
+
+QUESTION = "What is the length of the text: DOG"
+
+
+# ----------------------------------------
+# Scripts for the fake model
+# ----------------------------------------
+def make_script(steps: int, tool_name: str, structured: bool) -> List[AIMessage]:
+    """`steps` tool-calling turns followed by the final answer"""
+    script = [
+        AIMessage(
+            content="",
+            tool_calls=[{"name": tool_name, "args": {"query": f"step {i}"}, "id": f"call_{i}", "type": "tool_call"}],
+        )
+        for i in range(steps)
+    ]
+    if structured:
+        # create_agent with ProviderStrategy expects the final answer as AgentResponse JSON in the content
+        script.append(
+            AIMessage(
+                content=json.dumps({"answer": "DOG has 3 characters", "sources": [{"url": "https://example.com"}]})
+            )
+        )
+    else:
+        script.append(AIMessage(content="DOG has 3 characters"))
+    return script
+
+
+# ----------------------------------------
+# The four execution paths
+# Each builder returns a zero-argument function that runs ONE full agent conversation.
+# ----------------------------------------
+def build_agent_executor(model, tools) -> Callable[[], object]:
+    from langchain_classic.agents import AgentExecutor, create_tool_calling_agent
+
+    # Same prompt as 3-ToolCallingDemo.py
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", "You are a helpful assistant that can use tools."),
+            ("human", "{input}"),
+            ("placeholder", "{agent_scratchpad}"),
+        ]
+    )
+    agent = create_tool_calling_agent(llm=model, tools=tools, prompt=prompt)
+    agent_executor = AgentExecutor(agent=agent, tools=tools)
+    return lambda: agent_executor.invoke({"input": QUESTION})
+
+
+def _load_tool_calling_latest():
+    # "4.ToolCallingLatest.py" is not a valid module name, so it is loaded from its path
+    spec = importlib.util.spec_from_file_location(
+        "tool_calling_latest", os.path.join(ROOT, "Tool Calling", "4.ToolCallingLatest.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_bind_tools_loop(model, tools) -> Callable[[], object]:
+    module = _load_tool_calling_latest()
+    llm_with_tools = model.bind_tools(tools)
+    return lambda: module.run_agent_loop(llm_with_tools, tools, [HumanMessage(content=QUESTION)])
+
+
+def build_bind_tools_streaming(model, tools) -> Callable[[], object]:
+    module = _load_tool_calling_latest()
+    llm_with_tools = model.bind_tools(tools)
+    return lambda: module.run_streaming_agent_loop(llm_with_tools, tools, [HumanMessage(content=QUESTION)])
+
+
+def build_create_agent(model, tools) -> Callable[[], object]:
+    from langchain.agents import create_agent
+    from langchain.agents.middleware import ModelResponse, wrap_model_call
+    from langchain.agents.structured_output import ProviderStrategy, StructuredOutputValidationError
+
+    from response_stream import fallback_agent_response
+
+    # Same setup as 1-CodeForStructuredOutputAndPydantic.py, which can't be imported here because
+    # it builds a real ChatOpenAI and TavilySearch at import time. ProviderStrategy only reads
+    # the JSON from the message content, so it works with the scripted model as well.
+    @wrap_model_call
+    def structured_output_fallback(request, handler) -> ModelResponse:
+        try:
+            return handler(request)
+        except StructuredOutputValidationError as error:
+            return ModelResponse(
+                result=[error.ai_message], structured_response=fallback_agent_response(error.ai_message.text)
+            )
+
+    agent = create_agent(
+        model=model,
+        tools=tools,
+        response_format=ProviderStrategy(AgentResponse),
+        middleware=[structured_output_fallback],
+    )
+    return lambda: agent.invoke({"messages": [{"role": "user", "content": QUESTION}]})
+
+
+def build_state_graph(model, tools) -> Callable[[], object]:
+    from langgraph.graph import END, MessagesState, StateGraph
+    from langgraph.prebuilt import ToolNode
+
+    # Same graph as Langraph Intro/main6.py + nodes6.py. main6.py itself can't be imported
+    # here because it builds a real ChatOpenAI and renders flow.png at import time.
+    llm = model.bind_tools(tools)
+
+    def run_agent_reasoning(state: MessagesState):
+        response = llm.invoke([{"role": "system", "content": "You are a helpful assistant that can use tools to answer questions."}, *state["messages"]])
+        return {"messages": [response]}
+
+    def should_continue(state: MessagesState) -> str:
+        return "act" if state["messages"][-1].tool_calls else END
+
+    flow = StateGraph(MessagesState)
+    flow.add_node("agent_reason", run_agent_reasoning)
+    flow.add_node("act", ToolNode(tools))
+    flow.set_entry_point("agent_reason")
+    flow.add_conditional_edges("agent_reason", should_continue, {END: END, "act": "act"})
+    flow.add_edge("act", "agent_reason")
+    app = flow.compile()
+    return lambda: app.invoke({"messages": [HumanMessage(content=QUESTION)]})
+
+
+PATHS: Dict[str, tuple] = {
+    # name -> (builder, final answer is structured)
+    "agent_executor": (build_agent_executor, False),
+    "bind_tools_loop": (build_bind_tools_loop, False),
+    "bind_tools_streaming": (build_bind_tools_streaming, False),
+    "create_agent": (build_create_agent, True),
+    "state_graph": (build_state_graph, False),
+}
+
+
+def build_path(name: str, steps: int, model_latency: float, tool_latency: float) -> Callable[[], object]:
+    builder, structured = PATHS[name]
+    tool = make_fake_tool("lookup", latency=tool_latency)
+    model = ScriptedChatModel(script=make_script(steps, tool.name, structured), latency=model_latency)
+    return builder(model, [tool])
+
+
+# ----------------------------------------
+# Measurements
+# ----------------------------------------
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def measure_overhead(run: Callable[[], object], runs: int, steps: int) -> dict:
+    """Zero-latency runs: all measured time is framework time"""
+    run()  # warm-up (imports, graph compilation caches, ...)
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - started)
+    # One "step" = one model call (+ the tool call it requested); the final answer is a step too
+    model_calls = steps + 1
+    return {
+        "run_ms_p50": statistics.median(durations) * 1000,
+        "run_ms_p95": percentile(durations, 0.95) * 1000,
+        "overhead_us_per_step": statistics.median(durations) / model_calls * 1e6,
+    }
+
+
+def measure_memory(run: Callable[[], object]) -> dict:
+    run()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_kib_per_run": peak / 1024}
+
+
+def measure_throughput(run: Callable[[], object], concurrency: int, runs_per_worker: int) -> dict:
+    total = concurrency * runs_per_worker
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        list(pool.map(lambda _: run(), range(total)))
+        elapsed = time.perf_counter() - started
+    return {"concurrency": concurrency, "runs": total, "runs_per_s": total / elapsed}
+
+
+def package_versions() -> Dict[str, str]:
+    versions = {}
+    for package in ("langchain", "langchain-core", "langchain-classic", "langgraph"):
+        try:
+            versions[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paths", nargs="+", default=list(PATHS), choices=list(PATHS))
+    parser.add_argument("--steps", type=int, default=3, help="tool calls per run before the final answer")
+    parser.add_argument("--runs", type=int, default=50, help="runs for the overhead measurement")
+    parser.add_argument("--model-latency", type=float, default=0.02, help="seconds per model call (throughput only)")
+    parser.add_argument("--tool-latency", type=float, default=0.01, help="seconds per tool call (throughput only)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--runs-per-worker", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.paths:
+        print(f"Benchmarking {name}...", file=sys.stderr)
+        # Overhead and memory: no artificial latency, so only framework work is measured
+        run = build_path(name, args.steps, model_latency=0.0, tool_latency=0.0)
+        result = {"path": name}
+        result.update(measure_overhead(run, args.runs, args.steps))
+        result.update(measure_memory(run))
+
+        # Throughput: with latency, to see how each path overlaps waiting under load
+        run = build_path(name, args.steps, args.model_latency, args.tool_latency)
+        ideal_run_s = (args.steps + 1) * args.model_latency + args.steps * args.tool_latency
+        result["ideal_run_ms"] = ideal_run_s * 1000
+        result["throughput"] = [
+            measure_throughput(run, concurrency, args.runs_per_worker) for concurrency in args.concurrency
+        ]
+        results.append(result)
+
+    report = {
+        "benchmark": "agent_paths",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "versions": package_versions(),
+        "config": vars(args),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
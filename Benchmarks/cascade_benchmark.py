@@ -0,0 +1,152 @@
+"""
+Latency and cost of the model cascade (cascade.py) against always using the strong model.
+
+The RAG prompt of "RAG Examples/5-RAGNaiveRetrieval.py" (numbered context chunks) goes
+through two configurations:
+
+1. strong_only -> one ChatOpenAI(model="gpt-4o")-like tier
+2. cascade     -> a cheap tier first, escalated to the strong one by no_refusal + cites_sources
+
+Both tiers are fakes (fakes.py) with fixed latencies. The cheap tier answers easy questions
+with a citation. For the `--hard-share` of questions it cites nothing, or every other time
+answers "I don't know", so those escalate. Cost uses per-call prices you pass in. The
+defaults are rough relative prices, not a quote.
+
+Usage:
+    python Benchmarks/cascade_benchmark.py --requests 200 --hard-share 0.2 --output bench_cascade.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from langchain_core.messages import AIMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from cascade import CascadingChatModel, cites_sources, no_refusal
+from fakes import KeywordChatModel, ScriptedChatModel
+
+PROMPT = ChatPromptTemplate.from_template(
+    """Answer the question based only on the following context:
+    [1] Pinecone is a managed vector database.
+
+    [2] Chroma stores embeddings locally with DuckDB or ClickHouse.
+
+    [3] Milvus scales to trillions of vectors.
+
+    Question:{question}
+
+    Provide a detailed answer and cite the context you used as [1], [2], ...
+    """
+)
+
+
+def make_questions(count: int, hard_share: float, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    questions = []
+    for i in range(count):
+        if rng.random() < hard_share:
+            # Alternate between the two ways a small model fails
+            questions.append(f"HARD-{'REFUSE' if i % 2 else 'UNCITED'} question {i}")
+        else:
+            questions.append(f"easy question {i}")
+    return questions
+
+
+def build_models(cheap_latency: float, strong_latency: float):
+    cheap = KeywordChatModel(
+        script=[AIMessage(content="Pinecone is a managed vector database [1].")],
+        replies={
+            "HARD-REFUSE": AIMessage(content="I don't know based on this context."),
+            "HARD-UNCITED": AIMessage(content="It depends on many factors."),
+        },
+        latency=cheap_latency,
+    )
+    strong = ScriptedChatModel(
+        script=[AIMessage(content="Milvus scales furthest [3], Pinecone is fully managed [1].")],
+        latency=strong_latency,
+    )
+    return cheap, strong
+
+
+def run(chain, questions: List[str], concurrency: int) -> List[float]:
+    def one(question: str) -> float:
+        started = time.perf_counter()
+        chain.invoke({"question": question})
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, questions))
+
+
+def describe(latency: List[float]) -> Dict[str, float]:
+    ordered = sorted(latency)
+    return {
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[int(0.95 * (len(ordered) - 1))] * 1000,
+        "mean_ms": statistics.mean(ordered) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--hard-share", type=float, default=0.2, help="share of questions the cheap tier fails")
+    parser.add_argument("--cheap-latency", type=float, default=0.05, help="seconds per cheap call")
+    parser.add_argument("--strong-latency", type=float, default=0.2, help="seconds per strong call")
+    parser.add_argument("--cheap-cost", type=float, default=1.0, help="relative price per cheap call")
+    parser.add_argument("--strong-cost", type=float, default=16.0, help="relative price per strong call")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    questions = make_questions(args.requests, args.hard_share, args.seed)
+
+    cheap, strong = build_models(args.cheap_latency, args.strong_latency)
+    strong_only = CascadingChatModel(tiers=[strong], names=["strong"])
+    cascade = CascadingChatModel(tiers=[cheap, strong], checks=[no_refusal, cites_sources], names=["cheap", "strong"])
+
+    results = {}
+    for name, llm in (("strong_only", strong_only), ("cascade", cascade)):
+        latency = run(PROMPT | llm | StrOutputParser(), questions, args.concurrency)
+        stats = llm.stats.summary()
+        calls = {tier: data["calls"] for tier, data in stats["tiers"].items()}
+        cost = calls.get("cheap", 0) * args.cheap_cost + calls.get("strong", 0) * args.strong_cost
+        results[name] = {**describe(latency), "cost": cost, "cost_per_request": cost / len(questions), "tiers": stats["tiers"]}
+        print(
+            f"{name:<12} p50={results[name]['p50_ms']:.0f}ms p95={results[name]['p95_ms']:.0f}ms "
+            f"mean={results[name]['mean_ms']:.0f}ms cost/request={results[name]['cost_per_request']:.2f} "
+            + " ".join(f"{tier}: hit={data['hit_rate']:.0%}" for tier, data in stats["tiers"].items()),
+            file=sys.stderr,
+        )
+
+    report = {
+        "benchmark": "cascade",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Bytes written and save/load latency of delta-encoded checkpoints for long message runs.
+
+A StateGraph(MessagesState) ReAct-style loop (as in Langraph Intro/main6.py) appends an
+AIMessage with a tool call and a ToolMessage every step, with no LLM or network involved.
+It is checkpointed with DeltaSqliteSaver (delta_checkpoint.py) at several keyframe
+intervals. keyframe_every=1 stores the full message list at every step, which is what a
+plain checkpointer does, and serves as the baseline.
+
+Reported per configuration:
+- bytes written per step (grows with run length for the baseline, stays flat for deltas)
+- database file size
+- put() latency per step
+- cold get_tuple() of the latest checkpoint (new saver, empty cache)
+- warm get_tuple(), and a walk over the whole history
+
+Usage:
+    python Benchmarks/checkpoint_benchmark.py --steps 200 --output bench_checkpoints.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph import END, MessagesState, StateGraph
+
+from delta_checkpoint import DeltaSqliteSaver
+
+
+class TimedSaver(DeltaSqliteSaver):
+    """Records the duration and bytes of every put()"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.put_seconds: List[float] = []
+        self.put_bytes: List[int] = []
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        before = self.bytes_written
+        started = time.perf_counter()
+        result = super().put(config, checkpoint, metadata, new_versions)
+        self.put_seconds.append(time.perf_counter() - started)
+        self.put_bytes.append(self.bytes_written - before)
+        return result
+
+
+def build_graph(steps: int, message_chars: int):
+    text = ("The temperature in Hyderabad is 31 degrees Celsius with light winds. " * 50)[:message_chars]
+
+    def agent(state: MessagesState):
+        step = len(state["messages"]) // 2
+        return {
+            "messages": [
+                AIMessage(
+                    content=f"Step {step}: {text}",
+                    tool_calls=[{"name": "triple", "args": {"num": float(step)}, "id": f"call_{step}"}],
+                ),
+                ToolMessage(content=str(step * 3.0), tool_call_id=f"call_{step}"),
+            ]
+        }
+
+    def should_continue(state: MessagesState) -> str:
+        return END if len(state["messages"]) >= 2 * steps + 1 else "agent"
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("agent", agent)
+    builder.set_entry_point("agent")
+    builder.add_conditional_edges("agent", should_continue, {END: END, "agent": "agent"})
+    return builder
+
+
+def run_config(builder, steps: int, keyframe_every: int, directory: str) -> Dict:
+    path = os.path.join(directory, f"checkpoints-{keyframe_every}.sqlite")
+    saver = TimedSaver.from_path(path, keyframe_every=keyframe_every)
+    graph = builder.compile(checkpointer=saver)
+    config = {"configurable": {"thread_id": "bench"}, "recursion_limit": steps + 10}
+
+    started = time.perf_counter()
+    graph.invoke({"messages": [HumanMessage(content="What is the temperature in Hyderabad? Triple it.")]}, config)
+    run_s = time.perf_counter() - started
+    saver.close()
+
+    # Cold load: a new process would start with an empty cache
+    cold_saver = DeltaSqliteSaver.from_path(path, keyframe_every=keyframe_every)
+    started = time.perf_counter()
+    latest = cold_saver.get_tuple(config)
+    cold_load_s = time.perf_counter() - started
+    warm = []
+    for _ in range(20):
+        started = time.perf_counter()
+        cold_saver.get_tuple(config)
+        warm.append(time.perf_counter() - started)
+    started = time.perf_counter()
+    history = sum(1 for _ in cold_saver.list(config))
+    history_s = time.perf_counter() - started
+    cold_saver.close()
+
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    put_bytes = saver.put_bytes
+    return {
+        "keyframe_every": keyframe_every,
+        "checkpoints": len(saver.put_seconds),
+        "messages": len(latest.checkpoint["channel_values"]["messages"]),
+        "run_ms": run_s * 1000,
+        "bytes_written_total": saver.bytes_written,
+        "db_file_bytes": os.path.getsize(path),
+        "put_bytes_first_last": [put_bytes[1], put_bytes[-1]],
+        "put_bytes_per_step": put_bytes,
+        "put_ms_p50": statistics.median(saver.put_seconds) * 1000,
+        "put_ms_last_10pct": statistics.mean(saver.put_seconds[-max(1, len(saver.put_seconds) // 10):]) * 1000,
+        "load_latest_cold_ms": cold_load_s * 1000,
+        "load_latest_warm_ms": statistics.median(warm) * 1000,
+        "history_walk_ms": history_s * 1000,
+        "history_checkpoints": history,
+        "full_blobs": saver.full_blobs,
+        "delta_blobs": saver.delta_blobs,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=200, help="tool-call rounds (2 messages each)")
+    parser.add_argument("--message-chars", type=int, default=500)
+    parser.add_argument("--keyframes", type=int, nargs="+", default=[1, 10, 20, 50], help="1 = full list every step")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    builder = build_graph(args.steps, args.message_chars)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for keyframe_every in args.keyframes:
+            result = run_config(builder, args.steps, keyframe_every, directory)
+            results.append(result)
+            print(
+                f"keyframe_every={keyframe_every:<4} written={result['bytes_written_total'] / 2**20:7.2f}MiB "
+                f"file={result['db_file_bytes'] / 2**20:7.2f}MiB "
+                f"put bytes first/last={result['put_bytes_first_last'][0]}/{result['put_bytes_first_last'][1]} "
+                f"put p50={result['put_ms_p50']:.2f}ms last10%={result['put_ms_last_10pct']:.2f}ms "
+                f"load cold={result['load_latest_cold_ms']:.2f}ms warm={result['load_latest_warm_ms']:.2f}ms "
+                f"history={result['history_walk_ms']:.0f}ms",
+                file=sys.stderr,
+            )
+
+    report = {
+        "benchmark": "checkpoints",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
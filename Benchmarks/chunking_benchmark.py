@@ -0,0 +1,212 @@
+"""
+Offline retrieval benchmark that sweeps chunking settings.
+
+5-RAGIngestion.py and 5-RAGExampleonlyWithLCEL.py hardcode
+CharacterTextSplitter(chunk_size=1000, chunk_overlap=0). For every combination of splitter,
+chunk size and overlap this script:
+
+1. splits mediumblog1.txt + synthetic documents,
+2. ingests the chunks with a deterministic local embedder (fakes.HashingEmbeddings) into an
+   in-memory matrix (the same data Pinecone would store: one vector + the chunk text),
+3. runs a labeled question set, where a question counts as found when a retrieved chunk
+   contains its whole answer text,
+4. reports recall@k, context tokens sent to the LLM, index bytes and query latency.
+
+No network is used. Absolute recall is lower than with text-embedding-3 (the hashing embedder
+only matches shared words), so compare settings against each other, not against production.
+
+Usage:
+    python Benchmarks/chunking_benchmark.py --output bench_chunking.json
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from langchain_core.documents import Document
+from langchain_text_splitters import CharacterTextSplitter, RecursiveCharacterTextSplitter
+
+from fakes import HashingEmbeddings
+
+# (question, text that must appear in a retrieved chunk)
+BLOG_QUESTIONS: List[Tuple[str, str]] = [
+    ("Who said that 2023 is the year of vector databases?", "Chip Huen"),
+    ("What is a vector in machine learning?", "a vector is a collection of numerical values"),
+    ("What is an embedding technique used for?", "representing complex data, such as images, text, or audio"),
+    ("Which machine learning frameworks does Weaviate integrate with?", "Hugging Face, Open AI, LangChain"),
+    ("Which tools can Pinecone be synced with and monitored with?", "Airbyte and monitored using Datadog"),
+    ("Which storage options does Chroma DB support?", "DuckDB for standalone or ClickHouse for scalability"),
+    ("What are the two memory modes of Chroma DB?", "The in-memory mode"),
+    ("What mechanism did Qdrant introduce to reduce memory requirements?", "Scalar Quantization mechanism"),
+    ("How many vectors and queries can Milvus scale to?", "trillions of vectors and millions of queries per second"),
+    ("Who developed Milvus Lite?", "Bin Ji"),
+    ("What security features should a vector database provide?", "encryption, access controls, and authentication"),
+    ("What pricing should you look for when choosing a vector database?", "flexible pricing models"),
+]
+
+SPLITTERS = {
+    "character": lambda size, overlap: CharacterTextSplitter(chunk_size=size, chunk_overlap=overlap),
+    "recursive": lambda size, overlap: RecursiveCharacterTextSplitter(chunk_size=size, chunk_overlap=overlap),
+}
+
+FILLER = (
+    "The team reviewed the quarterly roadmap and agreed to revisit the open items next week. "
+    "Several dependencies were upgraded and the test suite was extended with new cases. "
+    "Customer feedback highlighted onboarding friction and slow dashboards. "
+    "An incident review documented the timeline, the impact and the follow-up actions. "
+    "Budget discussions were postponed until the hiring plan is final. "
+    "The design document received comments about naming and error handling. "
+)
+
+
+def synthetic_documents(count: int, seed: int = 7) -> Tuple[List[Document], List[Tuple[str, str]]]:
+    """Filler-heavy reports, each hiding one fact somewhere in the middle"""
+    rng = random.Random(seed)
+    sentences = [s.strip() + "." for s in FILLER.split(".") if s.strip()]
+    documents, questions = [], []
+    for i in range(count):
+        codename = f"Project {rng.choice(['Aurora', 'Basalt', 'Cobalt', 'Dune', 'Ember', 'Fjord'])}-{i}"
+        code = rng.randint(10000, 99999)
+        fact = f"The launch code of {codename} is {code}."
+        paragraphs = []
+        for _ in range(rng.randint(6, 12)):
+            paragraphs.append(" ".join(rng.choice(sentences) for _ in range(rng.randint(2, 5))))
+        paragraphs.insert(rng.randint(1, len(paragraphs) - 1), fact)
+        documents.append(Document(page_content="\n\n".join(paragraphs), metadata={"source": f"synthetic-{i}"}))
+        questions.append((f"What is the launch code of {codename}?", f"{codename} is {code}"))
+    return documents, questions
+
+
+def load_corpus(synthetic: int) -> Tuple[List[Document], List[Tuple[str, str]]]:
+    path = os.path.join(ROOT, "mediumblog1.txt")
+    with open(path, encoding="utf-8") as f:
+        blog = Document(page_content=f.read(), metadata={"source": path})
+    documents, questions = synthetic_documents(synthetic)
+    return [blog, *documents], BLOG_QUESTIONS + questions
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English with OpenAI tokenizers; avoids downloading tiktoken files
+    return max(1, len(text) // 4)
+
+
+def run_config(
+    splitter_name: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    documents: List[Document],
+    questions: List[Tuple[str, str]],
+    embeddings: HashingEmbeddings,
+    ks: List[int],
+) -> Dict:
+    splitter = SPLITTERS[splitter_name](chunk_size, chunk_overlap)
+    started = time.perf_counter()
+    chunks = splitter.split_documents(documents)
+    split_s = time.perf_counter() - started
+
+    texts = [chunk.page_content for chunk in chunks]
+    started = time.perf_counter()
+    matrix = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    ingest_s = time.perf_counter() - started
+
+    max_k = max(ks)
+    hits = {k: 0 for k in ks}
+    context_tokens = {k: [] for k in ks}
+    search_latency, query_latency = [], []
+    for question, answer in questions:
+        started = time.perf_counter()
+        query = np.asarray(embeddings.embed_query(question), dtype=np.float32)
+        search_started = time.perf_counter()
+        scores = matrix @ query
+        top = np.argpartition(-scores, min(max_k, len(scores) - 1))[:max_k]
+        top = top[np.argsort(-scores[top])]
+        finished = time.perf_counter()
+        search_latency.append(finished - search_started)
+        query_latency.append(finished - started)
+
+        for k in ks:
+            retrieved = [texts[i] for i in top[:k]]
+            hits[k] += any(answer in text for text in retrieved)
+            context_tokens[k].append(sum(estimate_tokens(text) for text in retrieved))
+
+    text_bytes = sum(len(text.encode("utf-8")) for text in texts)
+    return {
+        "splitter": splitter_name,
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "chunks": len(chunks),
+        "avg_chunk_chars": statistics.mean(len(text) for text in texts),
+        "index_bytes": {"vectors": int(matrix.nbytes), "text": text_bytes, "total": int(matrix.nbytes) + text_bytes},
+        "split_ms": split_s * 1000,
+        "ingest_ms": ingest_s * 1000,
+        "recall_at_k": {str(k): hits[k] / len(questions) for k in ks},
+        "context_tokens_at_k": {str(k): statistics.mean(context_tokens[k]) for k in ks},
+        "search_us_p50": statistics.median(search_latency) * 1e6,
+        "query_us_p50": statistics.median(query_latency) * 1e6,
+        "query_us_p95": sorted(query_latency)[int(0.95 * (len(query_latency) - 1))] * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--splitters", nargs="+", default=list(SPLITTERS), choices=list(SPLITTERS))
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[250, 500, 1000, 2000])
+    parser.add_argument("--overlaps", type=int, nargs="+", default=[0, 100, 200])
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--synthetic-docs", type=int, default=50)
+    parser.add_argument("--dimensions", type=int, default=384, help="dimensions of the hashing embedder")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    # CharacterTextSplitter warns for every paragraph longer than chunk_size
+    logging.getLogger("langchain_text_splitters.base").setLevel(logging.ERROR)
+
+    documents, questions = load_corpus(args.synthetic_docs)
+    embeddings = HashingEmbeddings(dimensions=args.dimensions)
+
+    results = []
+    for splitter_name, chunk_size, chunk_overlap in itertools.product(args.splitters, args.chunk_sizes, args.overlaps):
+        if chunk_overlap >= chunk_size:
+            continue
+        result = run_config(splitter_name, chunk_size, chunk_overlap, documents, questions, embeddings, args.k)
+        results.append(result)
+        recall = " ".join(f"R@{k}={result['recall_at_k'][str(k)]:.2f}" for k in args.k)
+        print(
+            f"{splitter_name:>9} size={chunk_size:<5} overlap={chunk_overlap:<4} chunks={result['chunks']:<5} "
+            f"{recall} ctx@{args.k[-1]}={result['context_tokens_at_k'][str(args.k[-1])]:.0f}tok "
+            f"index={result['index_bytes']['total'] / 1024:.0f}KiB query={result['query_us_p50']:.0f}us",
+            file=sys.stderr,
+        )
+
+    report = {
+        "benchmark": "chunking",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "corpus": {"documents": len(documents), "questions": len(questions)},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
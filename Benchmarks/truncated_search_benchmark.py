@@ -0,0 +1,186 @@
+"""
+Memory, speed and recall of two-stage truncated-dimension search (RAG Examples/truncated_search.py).
+
+For every (dims, shortlist) pair the benchmark reports:
+- recall@k: overlap of the two-stage top k with the exact full-vector top k
+- for the full vectors kept in RAM ("in_memory") and memory-mapped from a saved .npy ("mmap"),
+  each measured on its own index: resident bytes compared to the full float32 matrix, and
+  search latency p50/p95 compared to brute force over the full vectors in RAM
+
+The mmap timings run with the file in the OS page cache (it was just written); a cold
+cache adds one disk read per shortlisted row.
+
+By default the vectors are SYNTHETIC: random vectors whose per-dimension variance decays
+along the vector, so the leading dimensions carry most of the signal as in text-embedding-3.
+Real models concentrate information less cleanly, so for real numbers export vectors from
+your index (n x d float32) and pass them with --vectors vectors.npy.
+
+Usage:
+    python Benchmarks/truncated_search_benchmark.py --n 50000 --output bench_truncated.json
+    python Benchmarks/truncated_search_benchmark.py --vectors vectors.npy --queries 200
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "RAG Examples"))
+
+from truncated_search import TwoStageIndex
+
+
+def synthetic_vectors(n: int, d: int, decay: float, seed: int) -> np.ndarray:
+    """Unit vectors with variance ~ (i + 1) ** -decay in dimension i"""
+    rng = np.random.default_rng(seed)
+    scale = (np.arange(1, d + 1, dtype=np.float32) ** -(decay / 2)).astype(np.float32)
+    vectors = rng.standard_normal((n, d), dtype=np.float32) * scale
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def make_queries(vectors: np.ndarray, count: int, noise: float, seed: int) -> np.ndarray:
+    """Perturbed copies of random rows, like a question close to (but not equal to) a chunk"""
+    rng = np.random.default_rng(seed + 1)
+    rows = vectors[rng.integers(0, len(vectors), count)]
+    queries = rows + noise * rng.standard_normal(rows.shape, dtype=np.float32) * np.abs(rows).mean()
+    return (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+
+def percentile(samples: List[float], q: float) -> float:
+    return sorted(samples)[int(q * (len(samples) - 1))]
+
+
+def time_search(search, queries: np.ndarray, k: int) -> List[float]:
+    latency = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query, k)
+        latency.append(time.perf_counter() - started)
+    return latency
+
+
+def measure(index: TwoStageIndex, queries: np.ndarray, k: int, exact: Dict) -> Dict:
+    """Resident memory and search speed of ONE index, so both numbers describe the same setup"""
+    latency = time_search(index.search, queries, k)
+    p50 = statistics.median(latency)
+    return {
+        "resident_bytes": index.resident_bytes,
+        "memory_saved": 1 - index.resident_bytes / exact["bytes"],
+        "search_us_p50": p50 * 1e6,
+        "search_us_p95": percentile(latency, 0.95) * 1e6,
+        "speedup": exact["search_us_p50"] / (p50 * 1e6),
+    }
+
+
+def run_config(
+    vectors: np.ndarray, vectors_path: str, queries: np.ndarray, truth: List[set], dims: int, shortlist: int, k: int, exact: Dict
+) -> Dict:
+    started = time.perf_counter()
+    index = TwoStageIndex(vectors, dims=dims, shortlist=shortlist)
+    build_s = time.perf_counter() - started
+
+    found = 0
+    for query, expected in zip(queries, truth):
+        indices, _ = index.search(query, k)
+        found += len(expected.intersection(indices.tolist()))
+
+    # The same index with the full vectors memory-mapped from disk (TwoStageIndex.load):
+    # stage 2 then reads its shortlist rows from the file (through the OS page cache)
+    mapped = TwoStageIndex.load(vectors_path, dims=dims, shortlist=shortlist, mmap=True)
+    return {
+        "dims": dims,
+        "shortlist": shortlist,
+        "recall_at_k": found / (k * len(queries)),
+        "build_ms": build_s * 1000,
+        "in_memory": measure(index, queries, k, exact),
+        "mmap": measure(mapped, queries, k, exact),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", help=".npy file with real (n x d) embeddings instead of synthetic ones")
+    parser.add_argument("--n", type=int, default=20000, help="synthetic vectors")
+    parser.add_argument("--d", type=int, default=1536, help="synthetic dimensions (text-embedding-3-small)")
+    parser.add_argument("--decay", type=float, default=1.0, help="how fast synthetic variance falls off")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.5, help="query distance from its source row")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dims", type=int, nargs="+", default=[64, 128, 256, 512])
+    parser.add_argument("--shortlists", type=int, nargs="+", default=[20, 50, 100, 200])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    if args.vectors:
+        vectors = np.load(args.vectors).astype(np.float32)
+    else:
+        vectors = synthetic_vectors(args.n, args.d, args.decay, args.seed)
+    queries = make_queries(vectors, args.queries, args.noise, args.seed)
+    n, d = vectors.shape
+
+    # Brute force over full vectors is both the latency baseline and the recall reference
+    baseline = TwoStageIndex(vectors, dims=d, shortlist=n)
+    truth = [set(baseline.exact_search(query, args.k)[0].tolist()) for query in queries]
+    exact_latency = time_search(baseline.exact_search, queries, args.k)
+    exact = {
+        "bytes": int(vectors.nbytes),
+        "search_us_p50": statistics.median(exact_latency) * 1e6,
+        "search_us_p95": percentile(exact_latency, 0.95) * 1e6,
+    }
+    print(
+        f"exact        {n} x {d}  {exact['bytes'] / 2**20:.1f}MiB  p50={exact['search_us_p50']:.0f}us",
+        file=sys.stderr,
+    )
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        vectors_path = os.path.join(directory, "vectors.npy")
+        np.save(vectors_path, vectors)
+        for dims, shortlist in itertools.product(args.dims, args.shortlists):
+            if dims > d or shortlist < args.k:
+                continue
+            result = run_config(vectors, vectors_path, queries, truth, dims, shortlist, args.k, exact)
+            results.append(result)
+            print(
+                f"dims={dims:<5} shortlist={shortlist:<5} recall@{args.k}={result['recall_at_k']:.3f}  "
+                + "  ".join(
+                    f"{mode}: {result[mode]['resident_bytes'] / 2**20:.1f}MiB ({-result[mode]['memory_saved']:+.0%}) "
+                    f"p50={result[mode]['search_us_p50']:.0f}us ({result[mode]['speedup']:.1f}x)"
+                    for mode in ("in_memory", "mmap")
+                ),
+                file=sys.stderr,
+            )
+
+    report = {
+        "benchmark": "truncated_search",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "config": vars(args),
+        "vectors": "file" if args.vectors else "synthetic",
+        "shape": [n, d],
+        "exact": exact,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,12 @@ from langgraph.graph import MessagesState, StateGraph, END
 # tool_node → executes tools when requested
 from nodes6 import tool_node, run_agent_reasoning
 
+# Checkpointer that saves the state after every step to a local SQLite file.
+# The growing "messages" list is stored as deltas (only the new messages)
+from delta_checkpoint import DeltaSqliteSaver
+
+from uuid import uuid4
+
 
 # Load environment variables
 load_dotenv()
@@ -103,7 +109,8 @@ flow.add_edge(ACT, AGENT_REASON)
 # ----------------------------------------
 
 # Compile converts the graph definition into an executable app
-app = flow.compile()
+# With a checkpointer every step is saved, so a run can be inspected or resumed later
+app = flow.compile(checkpointer=DeltaSqliteSaver.from_path("checkpoints.sqlite"))
 
 
 # Optional: visualize the graph structure as an image
@@ -117,5 +124,7 @@ app.get_graph().draw_mermaid_png(output_file_path="flow.png")
 if __name__ == "__main__":
     print("Hello ReAct LangGraph with Function Calling")
 
-    res = app.invoke({"messages":[HumanMessage(content="What is the temperature in Hyderabad in India? List it and triple it.")]})
+    # A checkpointer needs a thread_id: all checkpoints of this run are saved under it
+    config = {"configurable": {"thread_id": str(uuid4())}}
+    res = app.invoke({"messages":[HumanMessage(content="What is the temperature in Hyderabad in India? List it and triple it.")]}, config)
     print(res["messages"][LAST].content)
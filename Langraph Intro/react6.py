@@ -3,6 +3,8 @@ from langchain.tools import tool
 from langchain_openai import ChatOpenAI
 from langchain_tavily import TavilySearch
 
+from cascade import CascadingChatModel, no_refusal, valid_tool_calls
+
 
 load_dotenv()
 
@@ -17,5 +19,10 @@ def triple(num:float) ->float:
 
 tools= [TavilySearch(max_results=1), triple]
 
-llm = ChatOpenAI(temperature=0, model='gpt-4o').bind_tools(tools)
+# gpt-4o-mini decides first; gpt-4o is asked only when the mini model calls an unknown tool,
+# passes arguments the tool rejects, or gives up
+llm = CascadingChatModel(
+    tiers=[ChatOpenAI(temperature=0, model='gpt-4o-mini'), ChatOpenAI(temperature=0, model='gpt-4o')],
+    checks=[valid_tool_calls(tools), no_refusal],
+).bind_tools(tools)
 
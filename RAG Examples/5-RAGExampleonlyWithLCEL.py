@@ -11,6 +11,10 @@ from langchain_pinecone import PineconeVectorStore
 from langchain_community.document_loaders import TextLoader
 from langchain_text_splitters import CharacterTextSplitter
 
+from retrievers import MMRRetriever
+from cascade import CascadingChatModel, cites_sources, no_refusal
+from truncated_search import embedding_dimensions
+
 print('Loading the docs...')
 docs = TextLoader("C:/Users/choll/Desktop/Studeis/My studies/LangChain with Langraph Basic LLM/langchain-course/mediumblog1.txt",encoding='utf-8')
 print('Got the documents, next splitting the text into chunks...')
@@ -19,9 +23,9 @@ text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=0)
 chunks = text_splitter.split_documents(docs.load())
 print(f'Text splitted into chunks, created {len(chunks)}, next creating the embeddings and ingesting into Pinecone...')
 
-embeddings = OpenAIEmbeddings(model='text-embedding-3-small')
+embeddings = OpenAIEmbeddings(model='text-embedding-3-small', dimensions=embedding_dimensions())
 vectorstore = PineconeVectorStore.from_documents(chunks,embeddings,index_name=os.getenv("INDEX_NAME"))
-retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
+retriever = MMRRetriever(vectorstore=vectorstore, embeddings=embeddings, k=3, fetch_k=30)
 
 
 print(f'Components initialized, next creating the prompt template and the retrieval chain...')
@@ -32,17 +36,21 @@ prompt_template = ChatPromptTemplate.from_template(
 
     Question:{question}
 
-    Provide a detailed answer
+    Provide a detailed answer and cite the context you used as [1], [2], ...
 
     """
 )
 
-llm = ChatOpenAI(temperature=0)
+# gpt-4o-mini answers first; gpt-4o gets the question only when the answer cites none of the numbered chunks or gives up
+llm = CascadingChatModel(
+    tiers=[ChatOpenAI(temperature=0, model="gpt-4o-mini"), ChatOpenAI(temperature=0, model="gpt-4o")],
+    checks=[no_refusal, cites_sources],
+)
 
 def format_docs(docs):
-    """Format retrieved documents into a single string"""
+    """Format retrieved documents into a single string, numbered so the answer can cite them"""
 
-    return '\n\n'.join(doc.page_content for doc in docs)
+    return '\n\n'.join(f"[{i}] {doc.page_content}" for i, doc in enumerate(docs, start=1))
 
 def create_retrieval_chain_with_lcel(query:str):
     """A simple retrival chain that retrieves relevant documents and formats them into a prompt for the LLM, using LCEL to format the retrieved documents"""
@@ -5,6 +5,8 @@ from langchain_text_splitters import CharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
 from langchain_pinecone import PineconeVectorStore
 
+from truncated_search import embedding_dimensions
+
 
 
 load_dotenv()
@@ -32,7 +34,9 @@ if __name__ == '__main__':
     print('Starting embedding generation...')
     
     try:
-        embeddings = OpenAIEmbeddings(model='text-embedding-3-small', chunk_size=1000)
+        # EMBEDDING_DIMENSIONS=256 stores shortened vectors (smaller index, faster search),
+        # the Pinecone index must be created with the same dimension
+        embeddings = OpenAIEmbeddings(model='text-embedding-3-small', chunk_size=1000, dimensions=embedding_dimensions())
         print("Embeddings object created successfully.")
     except Exception as e:
         print(f"Error creating embeddings object: {e}")
@@ -12,15 +12,28 @@ from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
 from operator import itemgetter
 
+from retrievers import MMRRetriever
+from truncated_search import embedding_dimensions
+from cascade import CascadingChatModel, cites_sources, no_refusal
+
 
 print('Initializing components....')
 
-llm = ChatOpenAI(temperature=0)
-embeddings = OpenAIEmbeddings()
+# gpt-4o-mini answers first; gpt-4o gets the question only when the answer cites none of the numbered chunks or gives up
+llm = CascadingChatModel(
+    tiers=[ChatOpenAI(temperature=0, model="gpt-4o-mini"), ChatOpenAI(temperature=0, model="gpt-4o")],
+    checks=[no_refusal, cites_sources],
+)
+# Must be the same model and size 5-RAGIngestion.py stored in the index (EMBEDDING_DIMENSIONS),
+# otherwise Pinecone rejects the query vector. rag_server.py reuses this object.
+embeddings = OpenAIEmbeddings(model='text-embedding-3-small', dimensions=embedding_dimensions())
 
 vectorstore=PineconeVectorStore(index_name=os.getenv("INDEX_NAME"), embedding=embeddings)
 
-retriever = vectorstore.as_retriever(search_kwargs={"k": 3}) # Selecting the top 3 most relevant chunks from the vector store
+# Plain top-3 similarity often returns 3 near-identical chunks:
+# retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
+# MMRRetriever fetches 30 candidates with their vectors and keeps 3 that are relevant AND different (see retrievers.py)
+retriever = MMRRetriever(vectorstore=vectorstore, embeddings=embeddings, k=3, fetch_k=30)
 
 
 prompt_template = ChatPromptTemplate.from_template(
@@ -29,15 +42,15 @@ prompt_template = ChatPromptTemplate.from_template(
 
     Question:{question}
 
-    Provide a detailed answer
+    Provide a detailed answer and cite the context you used as [1], [2], ...
 
     """
 )
 
 def format_docs(docs):
-    """Format retrieved documents into a single string"""
+    """Format retrieved documents into a single string, numbered so the answer can cite them"""
 
-    return '\n\n'.join(doc.page_content for doc in docs)
+    return '\n\n'.join(f"[{i}] {doc.page_content}" for i, doc in enumerate(docs, start=1))
 
 
 def retrieval_chain_without_lcel(query:str):
@@ -59,8 +72,11 @@ def retrieval_chain_without_lcel(query:str):
 
 
 # Method for RAG with LCE (Language Chain Execution Language)
-def create_retrieval_chain_with_lcel():
-    """A retrieval chain that uses LCE to execute the retrieval and formatting steps"""
+def create_retrieval_chain_with_lcel(retriever=retriever):
+    """A retrieval chain that uses LCE to execute the retrieval and formatting steps
+
+    param retriever: defaults to the module retriever, rag_server.py passes one with batched embeddings
+    """
 
     retrieval_chain =(
         RunnablePassthrough.assign(
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from typing import List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing when too many queries are already waiting"""
+
+
+class MicroBatchingEmbeddings(Embeddings):
+    """Wraps an Embeddings model and merges concurrent aembed_query() calls into one request.
+
+    Every query waits at most `batch_window_ms` for other queries to arrive, then all of
+    them are embedded with a single aembed_documents() call. A batch is also sent as soon
+    as it reaches `max_batch_size`. Because the vector store only calls aembed_query(),
+    the existing retrievers and LCEL chains use it without any change.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        batch_window_ms: float = 5.0,
+        max_batch_size: int = 64,
+        max_queue_depth: int = 1000,
+    ):
+        self.embeddings = embeddings
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.max_queue_depth = max_queue_depth
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight = 0
+        self._tasks = set()  # keeps running batches referenced until they finish
+
+        # Counters for /metrics
+        self.batches = 0
+        self.queries = 0
+        self.shed = 0
+        self.largest_batch = 0
+        self.embedding_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Queries waiting for a batch plus queries whose batch is being embedded"""
+        return len(self._pending) + self._in_flight
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "waiting": len(self._pending),
+            "in_flight": self._in_flight,
+            "batches": self.batches,
+            "queries": self.queries,
+            "shed": self.shed,
+            "avg_batch_size": self.queries / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "avg_batch_ms": self.embedding_seconds / self.batches * 1000 if self.batches else 0.0,
+        }
+
+    # Synchronous calls are passed straight through (ingestion, scripts)
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        if self.queue_depth >= self.max_queue_depth:
+            self.shed += 1
+            raise Overloaded(f"{self.queue_depth} queries are already waiting for embeddings")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[: self.max_batch_size], self._pending[self.max_batch_size :]
+        if self._pending:
+            # More than one batch was waiting, keep the timer going for the rest
+            self._timer = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        if batch:
+            self._in_flight += len(batch)
+            task = asyncio.ensure_future(self._embed_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _embed_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        started = time.perf_counter()
+        try:
+            vectors = await self.embeddings.aembed_documents([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():  # the request may have been cancelled meanwhile
+                    future.set_result(vector)
+        finally:
+            self._in_flight -= len(batch)
+            self.batches += 1
+            self.queries += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            self.embedding_seconds += time.perf_counter() - started
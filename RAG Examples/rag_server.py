@@ -0,0 +1,130 @@
+"""
+Serves the LCEL RAG chain from 5-RAGNaiveRetrieval.py as a long-lived async HTTP service.
+
+Concurrent questions are collected for a few milliseconds and their query embeddings are
+computed with ONE OpenAIEmbeddings request (see batching.py). The vector searches and the
+LLM calls then run concurrently again, one per question.
+
+    python "RAG Examples/rag_server.py" --port 8080 --batch-window-ms 5 --max-batch-size 64
+
+    POST /ask      {"question": "What is Pinecone?"}  ->  {"answer": "..."}
+    GET  /metrics  queue depth, batch sizes, shed requests, latency
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import time
+
+from aiohttp import web
+from langchain_pinecone import PineconeVectorStore
+
+from batching import MicroBatchingEmbeddings, Overloaded
+from retrievers import MMRRetriever
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+logger = logging.getLogger(__name__)
+
+
+def load_naive_retrieval_module():
+    # "5-RAGNaiveRetrieval.py" is not a valid module name, so it is loaded from its path
+    spec = importlib.util.spec_from_file_location("rag_naive_retrieval", os.path.join(HERE, "5-RAGNaiveRetrieval.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class RagService:
+    """Request handling, in-flight limit and metrics around a retrieval chain"""
+
+    def __init__(self, chain, batcher: MicroBatchingEmbeddings, max_inflight: int = 256):
+        self.chain = chain
+        self.batcher = batcher
+        self.max_inflight = max_inflight
+        self.inflight = 0
+        self.served = 0
+        self.failed = 0
+        self.shed = 0
+        self.latency_seconds = 0.0
+
+    async def ask(self, request: web.Request) -> web.Response:
+        # Load shedding: answer "come back later" right away instead of letting every
+        # request wait longer (and time out) once the service is saturated.
+        if self.inflight >= self.max_inflight:
+            self.shed += 1
+            return web.json_response({"error": "overloaded"}, status=503, headers={"Retry-After": "1"})
+
+        # Counted before the body is read, so a burst of requests can't all pass the check above
+        self.inflight += 1
+        started = time.perf_counter()
+        try:
+            try:
+                body = await request.json()
+                question = body["question"]
+            except (ValueError, KeyError, TypeError):
+                return web.json_response({"error": 'expected a JSON body like {"question": "..."}'}, status=400)
+            answer = await self.chain.ainvoke({"question": question})
+        except Overloaded:
+            self.shed += 1
+            return web.json_response({"error": "overloaded"}, status=503, headers={"Retry-After": "1"})
+        except Exception:
+            # The details stay in the server log, clients don't get to see internals
+            self.failed += 1
+            logger.exception("RAG request failed")
+            return web.json_response({"error": "internal error"}, status=500)
+        finally:
+            self.inflight -= 1
+        self.served += 1
+        self.latency_seconds += time.perf_counter() - started
+        return web.json_response({"answer": answer})
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "inflight": self.inflight,
+                "served": self.served,
+                "failed": self.failed,
+                "shed": self.shed,
+                "avg_latency_ms": self.latency_seconds / self.served * 1000 if self.served else 0.0,
+                "embeddings": self.batcher.metrics(),
+            }
+        )
+
+
+def create_app(service: RagService) -> web.Application:
+    app = web.Application()
+    app.router.add_post("/ask", service.ask)
+    app.router.add_get("/metrics", service.metrics)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Async RAG service with micro-batched query embeddings")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--batch-window-ms", type=float, default=5.0, help="how long a query waits for others")
+    parser.add_argument("--max-batch-size", type=int, default=64, help="queries per embeddings request")
+    parser.add_argument("--max-queue-depth", type=int, default=1000, help="queries waiting for embeddings before shedding")
+    parser.add_argument("--max-inflight", type=int, default=256, help="concurrent requests before shedding")
+    args = parser.parse_args()
+
+    rag = load_naive_retrieval_module()
+
+    # Same embeddings model and index as the script, only the query embedding is batched
+    batcher = MicroBatchingEmbeddings(
+        rag.embeddings,
+        batch_window_ms=args.batch_window_ms,
+        max_batch_size=args.max_batch_size,
+        max_queue_depth=args.max_queue_depth,
+    )
+    vectorstore = PineconeVectorStore(index_name=os.getenv("INDEX_NAME"), embedding=batcher)
+    retriever = MMRRetriever(vectorstore=vectorstore, embeddings=batcher, k=3, fetch_k=30)
+    chain = rag.create_retrieval_chain_with_lcel(retriever=retriever)
+
+    service = RagService(chain, batcher, max_inflight=args.max_inflight)
+    web.run_app(create_app(service), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
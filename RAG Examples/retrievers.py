@@ -0,0 +1,162 @@
+import asyncio
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+from truncated_search import TwoStageIndex
+
+
+def mmr_select(
+    query_vector: np.ndarray,
+    candidate_vectors: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.5,
+    min_relevance: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Maximal marginal relevance over a candidate matrix, fully vectorized.
+
+    Each round picks the candidate with the best
+        lambda_mult * similarity(query) - (1 - lambda_mult) * max similarity(already picked)
+    Instead of an n x n similarity matrix (or a Python loop over pairs), every round does one
+    matrix-vector product of the newly picked vector against all candidates and folds it into a
+    running "max similarity to the selection" array, so the whole selection costs (k + 1) products.
+
+    Candidates whose query similarity is below `min_relevance` are never picked.
+    Returns the picked row indices (in pick order) and the query similarity of every candidate.
+    """
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    query = np.asarray(query_vector, dtype=np.float32)
+
+    # Cosine similarity = dot product / norms. Dividing the (n,) results by the norms avoids
+    # building a normalized copy of the whole (n, d) candidate matrix.
+    norms = np.sqrt(np.einsum("ij,ij->i", candidates, candidates))
+    norms[norms == 0] = 1
+    relevance = (candidates @ query) / (norms * (np.linalg.norm(query) or 1))
+
+    if min_relevance is None:
+        available = np.ones(len(candidates), dtype=bool)
+    else:
+        available = relevance >= min_relevance
+    k = min(k, int(available.sum()))
+    selected = np.empty(k, dtype=np.int64)
+    if k == 0:
+        return selected, relevance
+
+    # The first pick is simply the most relevant candidate
+    best = int(np.argmax(np.where(available, relevance, -np.inf)))
+    selected[0] = best
+    available[best] = False
+    max_similarity = (candidates @ candidates[best]) / (norms * norms[best])
+
+    for rank in range(1, k):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected[rank] = best
+        available[best] = False
+        np.maximum(max_similarity, (candidates @ candidates[best]) / (norms * norms[best]), out=max_similarity)
+    return selected, relevance
+
+
+class MMRRetriever(BaseRetriever):
+    """Over-fetches candidates WITH their vectors from Pinecone and diversifies them locally.
+
+    A drop-in replacement for vectorstore.as_retriever(search_kwargs={"k": 3}) in LCEL chains:
+    instead of the 3 nearest (often near-identical) chunks it returns 3 chunks that are
+    relevant AND different from each other. The rescoring uses exact cosine similarity computed
+    locally; it is stored in each document's metadata as "relevance_score".
+    """
+
+    vectorstore: Any  # a PineconeVectorStore
+    embeddings: Embeddings
+    k: int = 3
+    fetch_k: int = 30  # candidates fetched from the index
+    lambda_mult: float = 0.5  # 1 = pure relevance, 0 = pure diversity
+    score_threshold: Optional[float] = None  # drop candidates less similar than this
+
+    def _fetch_candidates(self, query_vector: List[float]) -> Tuple[List[Document], np.ndarray]:
+        # The same index query PineconeVectorStore runs, plus include_values=True to get the vectors back
+        results = self.vectorstore.index.query(
+            vector=query_vector,
+            top_k=self.fetch_k,
+            include_metadata=True,
+            include_values=True,
+            namespace=self.vectorstore._namespace,
+        )
+        text_key = self.vectorstore._text_key
+        documents, vectors = [], []
+        for match in results["matches"]:
+            metadata = dict(match["metadata"] or {})
+            if text_key not in metadata:
+                continue
+            documents.append(Document(id=match.get("id"), page_content=metadata.pop(text_key), metadata=metadata))
+            vectors.append(match["values"])
+        return documents, np.asarray(vectors, dtype=np.float32)
+
+    def _select(self, query_vector: List[float], documents: List[Document], vectors: np.ndarray) -> List[Document]:
+        if not documents:
+            return []
+        selected, relevance = mmr_select(query_vector, vectors, self.k, self.lambda_mult, self.score_threshold)
+        results = []
+        for i in selected:
+            doc = documents[i]
+            doc.metadata["relevance_score"] = float(relevance[i])
+            results.append(doc)
+        return results
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        query_vector = self.embeddings.embed_query(query)
+        documents, vectors = self._fetch_candidates(query_vector)
+        return self._select(query_vector, documents, vectors)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        # aembed_query goes through MicroBatchingEmbeddings in rag_server.py
+        query_vector = await self.embeddings.aembed_query(query)
+        documents, vectors = await asyncio.to_thread(self._fetch_candidates, query_vector)
+        return self._select(query_vector, documents, vectors)
+
+
+class TwoStageRetriever(BaseRetriever):
+    """Local retriever over a TwoStageIndex: truncated-vector search, full-vector rescoring.
+
+    Useful for collections too large to search at full width in memory, e.g.
+        index = TwoStageIndex.load("vectors.npy", dims=256, shortlist=100)  # full vectors stay on disk
+        retriever = TwoStageRetriever(index=index, documents=chunks, embeddings=embeddings, k=3)
+    """
+
+    index: Any  # a TwoStageIndex
+    documents: List[Document]  # row i of the index is documents[i]
+    embeddings: Embeddings  # must return full-size vectors, the index truncates them itself
+    k: int = 3
+
+    @classmethod
+    def from_documents(
+        cls, documents: List[Document], embeddings: Embeddings, dims: int = 256, shortlist: int = 100, k: int = 3
+    ) -> "TwoStageRetriever":
+        vectors = np.asarray(embeddings.embed_documents([doc.page_content for doc in documents]), dtype=np.float32)
+        index = TwoStageIndex(vectors, dims=dims, shortlist=shortlist)
+        return cls(index=index, documents=documents, embeddings=embeddings, k=k)
+
+    def _select(self, query_vector: List[float]) -> List[Document]:
+        indices, scores = self.index.search(query_vector, self.k)
+        results = []
+        for i, score in zip(indices, scores):
+            doc = self.documents[i].model_copy(deep=True)
+            doc.metadata["relevance_score"] = float(score)
+            results.append(doc)
+        return results
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self._select(self.embeddings.embed_query(query))
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        query_vector = await self.embeddings.aembed_query(query)
+        return await asyncio.to_thread(self._select, query_vector)
@@ -1,6 +1,8 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_openai import ChatOpenAI
 
+from cascade import CascadingChatModel, no_refusal, not_truncated
+
 reflection_prompt = ChatPromptTemplate.from_messages(
     [
         (
@@ -20,6 +22,11 @@ generation_prompt = ChatPromptTemplate.from_messages(
     ]  
 )
 
-llm = ChatOpenAI(temperature=0, model="gpt-4o")
+# gpt-4o-mini writes and critiques first, gpt-4o takes over when its answer is refused or cut off.
+# llm.stats.summary() shows how many requests each model answered
+llm = CascadingChatModel(
+    tiers=[ChatOpenAI(temperature=0, model="gpt-4o-mini"), ChatOpenAI(temperature=0, model="gpt-4o")],
+    checks=[no_refusal, not_truncated],
+)
 generation_chain = generation_prompt | llm
 reflection_chain = reflection_prompt | llm
\ No newline at end of file
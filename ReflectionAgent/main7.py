@@ -33,6 +33,16 @@ from chains7 import generation_chain, reflection_chain
 
 
 from typing import TypedDict, Annotated
+from uuid import uuid4
+
+
+# --------------------------------------------
+# Checkpointer
+# --------------------------------------------
+# Saves the state after every step to a local SQLite file.
+# The message list only grows, so it is stored as deltas (only the new messages)
+# --------------------------------------------
+from delta_checkpoint import DeltaSqliteSaver
 
 
 # --------------------------------------------
@@ -133,7 +143,8 @@ builder.add_edge(REFLECT, GENERATE)
 
 
 # Compile graph into executable object
-graph = builder.compile()
+# With a checkpointer every step is saved, so a run can be inspected or resumed later
+graph = builder.compile(checkpointer=DeltaSqliteSaver.from_path("checkpoints.sqlite"))
 
 # Print Mermaid diagram (helps visualize graph structure)
 print(graph.get_graph().draw_mermaid())
@@ -164,9 +175,10 @@ if __name__ == "__main__":
     # IMPORTANT:
     # Graph expects a dictionary that matches the state schema
     # So we pass {"messages": [inputs]}
+    # A checkpointer needs a thread_id: all checkpoints of this run are saved under it
     result = graph.invoke({
         "messages": [inputs]
-    })
+    }, {"configurable": {"thread_id": str(uuid4())}})
 
     # Final state output (contains full message history)
     print(result)
\ No newline at end of file
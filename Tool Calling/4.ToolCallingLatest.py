@@ -1,9 +1,11 @@
-from typing import List
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
 from dotenv import load_dotenv
-from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
 from langchain.tools import tool, BaseTool
 from langchain_openai import ChatOpenAI
-from callbacks import AgentCallbackHandler
+from callbacks import TracingCallbackHandler
 
 # 1. Load environment variables (API Keys) from your .env file
 load_dotenv()
@@ -29,29 +31,13 @@ def find_tool_by_name(tools: List[BaseTool], tool_name: str) -> BaseTool:
     raise ValueError(f'Tool with name {tool_name} not found')
 
 
-if __name__ == '__main__':
-    print('Hello Langchain Tools (.bind_tools)!')
-    
-    # 4. Initialize our tool list and the LLM
-    tools = [get_text_length]
-    
-    # temperature=0 makes the AI predictable and literal (perfect for tool calling).
-    # callbacks handles the custom printing we defined in callbacks.py.
-    llm = ChatOpenAI(temperature=0, model='gpt-4o', callbacks=[AgentCallbackHandler()])
-
-    # 5. "Bind" the tools to the LLM. 
-    # This creates a special version of the LLM that is aware of our get_text_length function.
-    llm_with_tools = llm.bind_tools(tools)
-
-    # 6. Setup the initial conversation history with the user's question.
-    messages = [HumanMessage(content="What is the length of the text: DOG")]
-
-    # 7. THE AGENT LOOP: This keeps running until the AI provides a final text answer.
+# 4. THE AGENT LOOP: This keeps running until the AI provides a final text answer.
+def run_agent_loop(llm_with_tools, tools: List[BaseTool], messages: List[BaseMessage]) -> AIMessage:
     while True:
         # Send the current list of messages (history) to the AI
         ai_message = llm_with_tools.invoke(messages)
 
-        # 8. Check if the AI wants to use a tool. 
+        # Check if the AI wants to use a tool.
         # getattr() safely looks for the 'tool_calls' property without crashing if it's missing.
         tool_calls = getattr(ai_message, "tool_calls", None) or []
 
@@ -59,7 +45,7 @@ if __name__ == '__main__':
             # Step A: Save the AI's request to use a tool into our message history.
             # This is critical so the AI "remembers" it asked to use a tool.
             messages.append(ai_message)
-            
+
             # Step B: Execute every tool call the AI requested.
             for tool_call in tool_calls:
                 tool_name = tool_call.get("name")
@@ -69,18 +55,121 @@ if __name__ == '__main__':
                 # Run our Python function with the arguments the AI provided
                 tool_to_use = find_tool_by_name(tools, tool_name)
                 observation = tool_to_use.invoke(tool_args)
-                print(f"observation={observation}")
 
                 # Step C: Save the tool's output as a ToolMessage.
                 # We include the tool_call_id so the AI knows which request this answer belongs to.
                 messages.append(
                     ToolMessage(content=str(observation), tool_call_id=tool_call_id)
                 )
-            
-            # Step D: Jump back to the top of the loop. 
+
+            # Step D: Jump back to the top of the loop.
             # We send the updated history (Question + Tool Request + Tool Result) back to the AI.
             continue
 
-        # 9. FINAL ANSWER: If no tool calls were requested, it means the AI is giving us its final reply.
-        print(ai_message.content)
-        break # Exit the loop
\ No newline at end of file
+        # FINAL ANSWER: If no tool calls were requested, it means the AI is giving us its final reply.
+        return ai_message
+
+
+# 5. STREAMING VERSION OF ONE AGENT TURN.
+# With .invoke() we wait for the whole AIMessage before running any tool.
+# With .stream() the tool calls arrive piece by piece (tool_call_chunks), so we can start
+# a tool as soon as ITS arguments are complete, while the model is still writing the next call.
+def stream_and_dispatch_tools(
+    llm_with_tools,
+    tools: List[BaseTool],
+    messages: List[BaseMessage],
+    executor: ThreadPoolExecutor,
+) -> AIMessage:
+    full_message = None
+    # index of the call in the response -> {"id", "name", "args"} assembled so far
+    pending: Dict[int, dict] = {}
+    running: Dict[int, Future] = {}
+
+    def dispatch(index: int) -> None:
+        call = pending[index]
+        if index in running or not call["id"] or not call["name"]:
+            return
+        # Cheap check first: the arguments can only be complete once they end with "}"
+        if not call["args"].rstrip().endswith("}"):
+            return
+        try:
+            args = json.loads(call["args"])
+        except json.JSONDecodeError:
+            return
+        tool_to_use = find_tool_by_name(tools, call["name"])
+        running[index] = executor.submit(tool_to_use.invoke, args)
+
+    for chunk in llm_with_tools.stream(messages):
+        full_message = chunk if full_message is None else full_message + chunk
+        for tool_call_chunk in chunk.tool_call_chunks:
+            index = tool_call_chunk.get("index")
+            if index is None:
+                # Some providers send no index: a chunk with an id starts a new call, one without continues the last
+                index = len(pending) - 1 if tool_call_chunk.get("id") is None else len(pending)
+            call = pending.setdefault(index, {"id": None, "name": None, "args": ""})
+            call["id"] = call["id"] or tool_call_chunk.get("id")
+            call["name"] = call["name"] or tool_call_chunk.get("name")
+            call["args"] += tool_call_chunk.get("args") or ""
+            dispatch(index)
+
+    if not pending:
+        return full_message
+
+    # The model can only reply to its tool calls if it sees its own request first.
+    messages.append(full_message)
+
+    # Results go back in the ORIGINAL call order, no matter which tool finished first.
+    for index in sorted(pending):
+        call = pending[index]
+        if index not in running:
+            # The stream ended before the arguments parsed: either a tool without arguments
+            # that streamed none at all, or invalid JSON that we report back to the model.
+            call["args"] = call["args"] or "{}"
+            dispatch(index)
+        if index in running:
+            content = str(running[index].result())
+            messages.append(ToolMessage(content=content, tool_call_id=call["id"]))
+        else:
+            messages.append(
+                ToolMessage(
+                    content=f"Error: could not parse arguments {call['args']!r} for tool {call['name']}",
+                    tool_call_id=call["id"],
+                    status="error",
+                )
+            )
+    return full_message
+
+
+def run_streaming_agent_loop(
+    llm_with_tools, tools: List[BaseTool], messages: List[BaseMessage], max_workers: int = 4
+) -> AIMessage:
+    # Same loop as run_agent_loop, but every turn overlaps tool execution with generation.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            ai_message = stream_and_dispatch_tools(llm_with_tools, tools, messages, executor)
+            if not ai_message.tool_calls and not ai_message.invalid_tool_calls:
+                return ai_message
+
+
+if __name__ == '__main__':
+    print('Hello Langchain Tools (.bind_tools)!')
+
+    # 6. Initialize our tool list and the LLM
+    tools = [get_text_length]
+
+    # temperature=0 makes the AI predictable and literal (perfect for tool calling).
+    # callbacks records timings, token usage and tool calls to traces.jsonl (see callbacks.py).
+    # Swap in AgentCallbackHandler() to print every prompt/response while debugging.
+    tracer = TracingCallbackHandler(path="traces.jsonl")
+    llm = ChatOpenAI(temperature=0, model='gpt-4o', callbacks=[tracer])
+
+    # 7. "Bind" the tools to the LLM.
+    # This creates a special version of the LLM that is aware of our get_text_length function.
+    llm_with_tools = llm.bind_tools(tools)
+
+    # 8. Setup the initial conversation history with the user's question.
+    messages = [HumanMessage(content="What is the length of the text: DOG")]
+
+    # 9. Run the agent. run_agent_loop(llm_with_tools, tools, messages) is the non-streaming version.
+    final_message = run_streaming_agent_loop(llm_with_tools, tools, messages)
+    print(final_message.content)
@@ -1,6 +1,16 @@
-from typing import Any, Dict, List
+import atexit
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from typing import Any, Deque, Dict, List, Optional
+from uuid import UUID
 
 from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
 from langchain_core.outputs import LLMResult
 
 
@@ -15,4 +25,296 @@ class AgentCallbackHandler(BaseCallbackHandler):
     def on_llm_end(self, response: LLMResult, **kwargs: Any) -> Any:
         """Run when LLM ends running."""
         print(f"***LLM Response:***\n{response.generations[0][0].text}")
-        print("*********")
\ No newline at end of file
+        print("*********")
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Low-overhead structured tracing for LLM and tool runs.
+
+    The callbacks only take timestamps and append plain dicts to an in-memory
+    ring buffer; JSON encoding and file I/O happen on a background thread that
+    flushes the buffer to a rotating JSONL file.
+    """
+
+    # The callbacks never block, so async runs can call them directly instead
+    # of handing every event to a thread pool executor.
+    run_inline = True
+
+    def __init__(
+        self,
+        path: str = "traces.jsonl",
+        sample_rate: float = 1.0,
+        max_prompt_chars: int = 500,
+        buffer_size: int = 10_000,
+        flush_interval: float = 1.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+    ) -> None:
+        """
+        param path: the JSONL file traces are written to
+        param sample_rate: fraction of root runs to record, child runs follow their root (errors are always recorded)
+        param max_prompt_chars: prompts/outputs are truncated to this length, 0 disables capturing them
+        param buffer_size: ring buffer capacity, the oldest records are dropped (and counted) when it is full
+        param flush_interval: seconds between background flushes
+        param max_bytes: size at which the JSONL file is rotated
+        param backup_count: number of rotated files to keep
+        """
+        self.sample_rate = sample_rate
+        self.max_prompt_chars = max_prompt_chars
+        self.flush_interval = flush_interval
+
+        # deque.append / deque.popleft are atomic in CPython, so the callbacks
+        # (producers) and the flusher thread (consumer) never need a lock.
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        # Records pushed out of the full buffer; flush() writes how many were lost
+        self.dropped = 0
+        self._dropped_reported = 0
+
+        # run_id -> (partial record, perf_counter start) for sampled runs only
+        self._spans: Dict[UUID, tuple] = {}
+        # run_id -> sampled? for runs that are still open, so a child run (tool, LLM call)
+        # is kept or skipped together with its parent instead of on its own dice roll
+        self._sampled: Dict[UUID, bool] = {}
+
+        self._writer = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="trace-flusher", daemon=True
+        )
+        self._flusher.start()
+        # Unregistered again in close(), so a closed handler can be garbage collected
+        atexit.register(self.close)
+
+    # -----------------------------
+    # Helpers (hot path)
+    # -----------------------------
+    def _sample(self, run_id: UUID, parent_run_id: Optional[UUID]) -> bool:
+        """Decides once per root run, every child inherits the decision of its parent"""
+        if self.sample_rate >= 1.0:
+            return True
+        sampled = self._sampled.get(parent_run_id) if parent_run_id is not None else None
+        if sampled is None:
+            sampled = random.random() < self.sample_rate
+        self._sampled[run_id] = sampled
+        return sampled
+
+    def _push(self, record: Dict[str, Any]) -> None:
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(record)
+
+    def _start_span(self, run_id: UUID, parent_run_id: Optional[UUID], record: Dict[str, Any]) -> None:
+        if not self._sample(run_id, parent_run_id):
+            return
+        record["start"] = time.time()
+        self._spans[run_id] = (record, time.perf_counter())
+
+    def _end_span(self, run_id: UUID, **fields: Any) -> None:
+        span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        record, started = span
+        record["duration_ms"] = (time.perf_counter() - started) * 1000
+        record.update(fields)
+        self._push(record)
+
+    def _error(self, run_id: UUID, error: BaseException) -> None:
+        self._sampled.pop(run_id, None)
+        span = self._spans.pop(run_id, None)
+        record, started = span if span else ({"type": "error", "run_id": str(run_id)}, None)
+        record["error"] = f"{type(error).__name__}: {error}"
+        if started is not None:
+            record["duration_ms"] = (time.perf_counter() - started) * 1000
+        else:
+            record["start"] = time.time()
+        self._push(record)
+
+    def _truncate(self, text: str) -> Optional[str]:
+        if not self.max_prompt_chars:
+            return None
+        return text[: self.max_prompt_chars]
+
+    # -----------------------------
+    # LLM callbacks
+    # -----------------------------
+    def on_llm_start(
+        self,
+        serialized: Dict[str, Any],
+        prompts: List[str],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Run when LLM starts running."""
+        self._start_span(
+            run_id,
+            parent_run_id,
+            {
+                "type": "llm",
+                "run_id": str(run_id),
+                "parent_run_id": str(parent_run_id) if parent_run_id else None,
+                "name": (serialized or {}).get("name"),
+                "prompt": self._truncate(prompts[0]) if prompts else None,
+            },
+        )
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[BaseMessage]],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Run when a chat model starts running."""
+        # Only the last message is captured; rendering the whole history on
+        # every call is exactly the cost this handler is meant to avoid.
+        prompt = None
+        if self.max_prompt_chars and messages and messages[0]:
+            prompt = self._truncate(str(messages[0][-1].content))
+        self._start_span(
+            run_id,
+            parent_run_id,
+            {
+                "type": "llm",
+                "run_id": str(run_id),
+                "parent_run_id": str(parent_run_id) if parent_run_id else None,
+                "name": (serialized or {}).get("name"),
+                "prompt": prompt,
+            },
+        )
+
+    def _end_llm_span(self, run_id: UUID, response: Optional[LLMResult], **fields: Any) -> None:
+        generation = response.generations[0][0] if response and response.generations and response.generations[0] else None
+        message = getattr(generation, "message", None)
+
+        usage = getattr(message, "usage_metadata", None)
+        if usage is None and response and response.llm_output:
+            usage = response.llm_output.get("token_usage")
+
+        self._end_span(
+            run_id,
+            output=self._truncate(generation.text) if generation else None,
+            token_usage=dict(usage) if usage else None,
+            tool_calls=[tc["name"] for tc in getattr(message, "tool_calls", None) or []],
+            **fields,
+        )
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> Any:
+        """Run when LLM ends running."""
+        self._sampled.pop(run_id, None)
+        if run_id in self._spans:
+            self._end_llm_span(run_id, response)
+
+    def on_llm_error(
+        self, error: BaseException, *, run_id: UUID, response: Optional[LLMResult] = None, **kwargs: Any
+    ) -> Any:
+        """Run when LLM errors."""
+        # Closing a stream early (e.g. once a ReAct step is complete) arrives here as
+        # GeneratorExit. The run did its job, so it is recorded as a cancelled run with the
+        # text generated so far instead of as an error.
+        if isinstance(error, GeneratorExit):
+            self._sampled.pop(run_id, None)
+            if run_id in self._spans:
+                self._end_llm_span(run_id, response, cancelled=True)
+            return
+        self._error(run_id, error)
+
+    # -----------------------------
+    # Tool callbacks
+    # -----------------------------
+    def on_tool_start(
+        self,
+        serialized: Dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Run when a tool starts running."""
+        self._start_span(
+            run_id,
+            parent_run_id,
+            {
+                "type": "tool",
+                "run_id": str(run_id),
+                "parent_run_id": str(parent_run_id) if parent_run_id else None,
+                "name": (serialized or {}).get("name"),
+                "input": self._truncate(input_str),
+            },
+        )
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> Any:
+        """Run when a tool ends running."""
+        self._sampled.pop(run_id, None)
+        if run_id in self._spans:
+            self._end_span(run_id, output=self._truncate(str(output)))
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> Any:
+        """Run when a tool errors."""
+        self._error(run_id, error)
+
+    # -----------------------------
+    # Chain callbacks
+    # Chains (agents, LCEL pipelines) are not recorded, they only carry the sampling
+    # decision from the root run down to the LLM and tool runs inside them.
+    # -----------------------------
+    def on_chain_start(
+        self,
+        serialized: Dict[str, Any],
+        inputs: Dict[str, Any],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Run when a chain starts running."""
+        self._sample(run_id, parent_run_id)
+
+    def on_chain_end(self, outputs: Dict[str, Any], *, run_id: UUID, **kwargs: Any) -> Any:
+        """Run when a chain ends running."""
+        self._sampled.pop(run_id, None)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> Any:
+        """Run when a chain errors."""
+        self._sampled.pop(run_id, None)
+
+    # -----------------------------
+    # Background flushing
+    # -----------------------------
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Drain the ring buffer into the JSONL file."""
+        while True:
+            try:
+                record = self._buffer.popleft()
+            except IndexError:
+                break
+            self._write(record)
+        # Losses since the last flush, so a reader of the file knows records are missing
+        dropped = self.dropped
+        if dropped > self._dropped_reported:
+            self._write({"type": "dropped", "count": dropped - self._dropped_reported, "total": dropped, "time": time.time()})
+            self._dropped_reported = dropped
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, default=str)
+        self._writer.emit(logging.makeLogRecord({"msg": line, "args": None}))
+
+    def close(self) -> None:
+        """Stop the flusher thread and write out whatever is still buffered."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._flusher.join()
+        self.flush()
+        self._writer.close()
+        atexit.unregister(self.close)
@@ -0,0 +1,307 @@
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Type
+
+from langchain_core.callbacks import AsyncCallbackManager, CallbackManager
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.json import parse_json_markdown
+from pydantic import BaseModel, ConfigDict, PrivateAttr, ValidationError
+
+# --- CONCEPT: MODEL CASCADE ---
+# Most requests are easy and a small model (gpt-4o-mini) answers them well, faster and
+# cheaper than gpt-4o. A cascade asks the cheap model first and runs cheap CHECKS on its
+# answer (does it parse? does it cite the context? is it sure?). Only when a check fails
+# is the same request sent to the next, stronger model. The last model's answer is always used.
+# ------------------------------
+
+# A check looks at the request and the answer and returns None when the answer is
+# good enough, otherwise a short reason (used in the stats), e.g. "no citation".
+Check = Callable[[List[BaseMessage], AIMessage], Optional[str]]
+
+REFUSALS = ("i don't know", "i do not know", "i'm not sure", "i am not sure", "i cannot", "i can't", "unable to")
+
+
+def _text(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def no_refusal(messages: List[BaseMessage], response: AIMessage) -> Optional[str]:
+    """Fails when the model gave up or returned nothing"""
+    text = _text(response).strip().lower()
+    if not text and not response.tool_calls:
+        return "empty answer"
+    if text.startswith(REFUSALS):
+        return "refusal"
+    return None
+
+
+def not_truncated(messages: List[BaseMessage], response: AIMessage) -> Optional[str]:
+    """Fails when the answer was cut off by max_tokens"""
+    if response.response_metadata.get("finish_reason") == "length":
+        return "truncated"
+    return None
+
+
+def valid_schema(schema: Type[BaseModel]) -> Check:
+    """Fails unless the answer (JSON text or a tool call named after the schema) validates against `schema`"""
+
+    def check(messages: List[BaseMessage], response: AIMessage) -> Optional[str]:
+        calls = [call for call in response.tool_calls if call["name"] == schema.__name__]
+        try:
+            schema.model_validate(calls[0]["args"] if calls else parse_json_markdown(_text(response)))
+        except (ValidationError, ValueError):
+            return f"invalid {schema.__name__}"
+        return None
+
+    return check
+
+
+def valid_tool_calls(tools: Sequence[Any]) -> Check:
+    """Fails when the model calls an unknown tool or passes arguments the tool's schema rejects"""
+    by_name = {tool.name: tool for tool in tools if hasattr(tool, "name")}
+
+    def check(messages: List[BaseMessage], response: AIMessage) -> Optional[str]:
+        if response.invalid_tool_calls:
+            return "unparsable tool call"
+        for call in response.tool_calls:
+            tool = by_name.get(call["name"])
+            if tool is None:
+                return f"unknown tool {call['name']}"
+            schema = tool.get_input_schema()
+            try:
+                schema.model_validate(call["args"])
+            except ValidationError:
+                return f"invalid arguments for {call['name']}"
+        return None
+
+    return check
+
+
+def min_confidence(threshold: float) -> Check:
+    """Fails when the self-reported "Confidence: 0.7" (or 70%) is missing or below `threshold`.
+
+    The prompt has to ask for it, e.g. "End with a line 'Confidence: <0-1>'".
+    """
+    pattern = re.compile(r"confidence\W{0,3}\s*([0-9]*\.?[0-9]+)\s*(%?)", re.IGNORECASE)
+
+    def check(messages: List[BaseMessage], response: AIMessage) -> Optional[str]:
+        found = pattern.findall(_text(response))
+        if not found:
+            return "no confidence"
+        value, percent = found[-1]
+        confidence = float(value) / 100 if percent or float(value) > 1 else float(value)
+        if confidence < threshold:
+            return "low confidence"
+        return None
+
+    return check
+
+
+# A context chunk starts its line with its number, as format_docs in the RAG scripts writes
+# them ("[1] text"). Other "[n]" in the prompt, like "cite the context you used as [1], [2], ...",
+# are not sources.
+SOURCE_MARKER = re.compile(r"^\s*\[(\d+)\]\s", re.MULTILINE)
+CITATION = re.compile(r"\[(\d+)\]")
+
+
+def cites_sources(messages: List[BaseMessage], response: AIMessage) -> Optional[str]:
+    """Fails when the prompt has numbered context chunks and the answer cites none of them,
+    or cites a number that is not one of the chunks.
+
+    A prompt without numbered chunks (e.g. nothing was retrieved) has nothing to cite, so the check passes.
+    """
+    available = {marker for message in messages for marker in SOURCE_MARKER.findall(_text(message))}
+    if not available:
+        return None
+    cited = set(CITATION.findall(_text(response)))
+    if not cited:
+        return "no citation"
+    if not cited <= available:
+        return "unknown citation"
+    return None
+
+
+class CascadeStats:
+    """Per-tier counters, shared by a cascade and its bind_tools() copies.
+
+    Only the latest `latency_window` request latencies are kept for the p50, so a
+    long-lived server (rag_server.py) does not grow the list forever.
+    """
+
+    def __init__(self, names: List[str], latency_window: int = 10_000):
+        self.names = names
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.calls = {name: 0 for name in names}
+        self.accepted = {name: 0 for name in names}  # requests answered by this tier
+        self.errors = {name: 0 for name in names}
+        self.escalations: Dict[str, Dict[str, int]] = {name: {} for name in names}  # reason -> count
+        self.seconds = {name: 0.0 for name in names}
+        self.request_seconds: Deque[float] = deque(maxlen=latency_window)
+
+    def record_call(self, name: str, seconds: float, reason: Optional[str], error: bool = False) -> None:
+        with self.lock:
+            self.calls[name] += 1
+            self.seconds[name] += seconds
+            if error:
+                self.errors[name] += 1
+            if reason is None:
+                self.accepted[name] += 1
+            else:
+                self.escalations[name][reason] = self.escalations[name].get(reason, 0) + 1
+
+    def record_request(self, seconds: float) -> None:
+        with self.lock:
+            self.requests += 1
+            self.request_seconds.append(seconds)
+
+    def summary(self) -> dict:
+        with self.lock:
+            latencies = list(self.request_seconds)
+            summary = {
+                "requests": self.requests,
+                "tiers": {
+                    name: {
+                        "calls": self.calls[name],
+                        "accepted": self.accepted[name],
+                        # share of ALL requests answered by this tier
+                        "hit_rate": self.accepted[name] / self.requests if self.requests else 0.0,
+                        "errors": self.errors[name],
+                        "escalations": dict(self.escalations[name]),
+                        "avg_ms": self.seconds[name] / self.calls[name] * 1000 if self.calls[name] else 0.0,
+                    }
+                    for name in self.names
+                },
+            }
+        # Sorted outside the lock, so requests don't wait for the summary
+        latencies.sort()
+        summary["p50_ms"] = latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+        return summary
+
+
+class CascadingChatModel(BaseChatModel):
+    """Chat model that tries `tiers` in order and escalates when a check fails.
+
+    Usage:
+        llm = CascadingChatModel(
+            tiers=[ChatOpenAI(model="gpt-4o-mini"), ChatOpenAI(model="gpt-4o")],
+            checks=[no_refusal, cites_sources],
+        )
+        chain = prompt | llm
+        print(llm.stats.summary())
+
+    An error in a tier (timeout, rate limit) escalates too. Checks need the whole answer,
+    so streaming yields the accepted answer in one piece. Callbacks see one LLM run per
+    request; the tier that answered is in response_metadata["cascade_tier"].
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    tiers: List[Any]  # chat models, or chat models with .bind_tools()
+    checks: List[Check] = []
+    names: Optional[List[str]] = None
+
+    _stats: CascadeStats = PrivateAttr()
+
+    def model_post_init(self, context: Any, /) -> None:
+        super().model_post_init(context)
+        if not self.tiers:
+            raise ValueError("CascadingChatModel needs at least one tier")
+        if self.names is None:
+            self.names = [self._tier_name(tier, i) for i, tier in enumerate(self.tiers)]
+        self._stats = CascadeStats(self.names)
+
+    @staticmethod
+    def _tier_name(tier: Any, index: int) -> str:
+        model = getattr(tier, "bound", tier)  # .bind_tools() wraps the model in a RunnableBinding
+        name = getattr(model, "model_name", None) or getattr(model, "model", None)
+        return f"{index}:{name}" if isinstance(name, str) else f"tier{index}"
+
+    @property
+    def stats(self) -> CascadeStats:
+        return self._stats
+
+    @property
+    def _llm_type(self) -> str:
+        return "cascading-chat-model"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "CascadingChatModel":
+        """Binds the tools to every tier, the copy keeps counting into the same stats"""
+        cascade = CascadingChatModel(
+            tiers=[tier.bind_tools(tools, **kwargs) for tier in self.tiers], checks=self.checks, names=self.names
+        )
+        cascade._stats = self._stats
+        return cascade
+
+    def _failed_check(self, messages: List[BaseMessage], response: AIMessage) -> Optional[str]:
+        for check in self.checks:
+            reason = check(messages, response)
+            if reason is not None:
+                return reason
+        return None
+
+    @staticmethod
+    def _tier_callbacks(run_manager, manager_class) -> Optional[dict]:
+        """Config that makes each tier call a child run of the cascade's run.
+
+        Without it the callers' callbacks (TracingCallbackHandler, LangSmith) never see the
+        tier calls, and the tokens of a cheap answer that was escalated are not counted.
+        Same as RunManager.get_child(), which LLM run managers don't have.
+        """
+        if run_manager is None:
+            return None
+        manager = manager_class(handlers=[], parent_run_id=run_manager.run_id)
+        manager.set_handlers(run_manager.inheritable_handlers)
+        manager.add_tags(run_manager.inheritable_tags)
+        manager.add_metadata(run_manager.inheritable_metadata)
+        return {"callbacks": manager}
+
+    def _accept(self, response: AIMessage, name: str, started: float) -> ChatResult:
+        self._stats.record_request(time.perf_counter() - started)
+        response.response_metadata["cascade_tier"] = name
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+    def _generate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        started = time.perf_counter()
+        config = self._tier_callbacks(run_manager, CallbackManager)
+        last = len(self.tiers) - 1
+        for i, (name, tier) in enumerate(zip(self.names, self.tiers)):
+            call_started = time.perf_counter()
+            try:
+                response = tier.invoke(messages, config, stop=stop, **kwargs)
+            except Exception:
+                self._stats.record_call(name, time.perf_counter() - call_started, "error", error=True)
+                if i == last:
+                    raise
+                continue
+            # The last tier has nobody to escalate to, its answer is used as it is
+            reason = self._failed_check(messages, response) if i < last else None
+            self._stats.record_call(name, time.perf_counter() - call_started, reason)
+            if reason is None:
+                return self._accept(response, name, started)
+
+    async def _agenerate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        started = time.perf_counter()
+        config = self._tier_callbacks(run_manager, AsyncCallbackManager)
+        last = len(self.tiers) - 1
+        for i, (name, tier) in enumerate(zip(self.names, self.tiers)):
+            call_started = time.perf_counter()
+            try:
+                response = await tier.ainvoke(messages, config, stop=stop, **kwargs)
+            except Exception:
+                self._stats.record_call(name, time.perf_counter() - call_started, "error", error=True)
+                if i == last:
+                    raise
+                continue
+            reason = self._failed_check(messages, response) if i < last else None
+            self._stats.record_call(name, time.perf_counter() - call_started, reason)
+            if reason is None:
+                return self._accept(response, name, started)
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import re
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import BaseTool, StructuredTool
+
+# --- CONCEPT: OFFLINE FAKES ---
+# Benchmarks and offline checks cannot call OpenAI or Tavily.
+# These stand-ins behave like the real thing (same message types, same tool calling
+# protocol) but answer from a fixed script, with an optional artificial latency.
+# ------------------------------
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that replays a fixed script of AIMessages"""
+
+    # script[i] is the reply once the conversation already contains i AI messages.
+    # Deciding the turn from the input keeps the model stateless, so one instance
+    # can serve many concurrent runs. The last entry is repeated if the script runs out.
+    script: List[AIMessage]
+
+    # Seconds to sleep per call, to stand in for network + generation time.
+    latency: float = 0.0
+
+    # Number of chunks a streamed reply is split into (latency is spread over them).
+    stream_chunks: int = 4
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-chat-model"
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        turn = sum(1 for m in messages if isinstance(m, AIMessage))
+        return self.script[min(turn, len(self.script) - 1)].model_copy(deep=True)
+
+    def _generate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    def _stream(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        reply = self._reply(messages)
+        pieces: List[AIMessageChunk] = []
+
+        # Text content is split into roughly equal slices
+        content = reply.content if isinstance(reply.content, str) else ""
+        step = max(1, -(-len(content) // self.stream_chunks))
+        for i in range(0, len(content), step):
+            pieces.append(AIMessageChunk(content=content[i : i + step]))
+
+        # Each tool call is sent like OpenAI does: a header with id + name, then argument slices
+        for index, tool_call in enumerate(reply.tool_calls):
+            pieces.append(
+                AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[{"name": tool_call["name"], "id": tool_call["id"], "args": "", "index": index}],
+                )
+            )
+            raw_args = json.dumps(tool_call["args"])
+            arg_step = max(1, -(-len(raw_args) // self.stream_chunks))
+            for i in range(0, len(raw_args), arg_step):
+                pieces.append(
+                    AIMessageChunk(
+                        content="",
+                        tool_call_chunks=[{"name": None, "id": None, "args": raw_args[i : i + arg_step], "index": index}],
+                    )
+                )
+
+        delay = self.latency / max(1, len(pieces))
+        for piece in pieces or [AIMessageChunk(content="")]:
+            if delay:
+                time.sleep(delay)
+            if run_manager and piece.content:
+                run_manager.on_llm_new_token(piece.content)
+            yield ChatGenerationChunk(message=piece)
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        # The script already decides which tools get called, so binding is a no-op.
+        return self
+
+
+class KeywordChatModel(ScriptedChatModel):
+    """ScriptedChatModel that picks the reply by a keyword in the last message.
+
+    replies={"HARD": AIMessage("I don't know")} answers every request containing "HARD"
+    that way, all other requests follow the script. Lets one model give easy and hard
+    requests different answers, e.g. to test escalation in cascade.py.
+    """
+
+    replies: Dict[str, AIMessage] = {}
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        text = messages[-1].content if messages and isinstance(messages[-1].content, str) else ""
+        for keyword, reply in self.replies.items():
+            if keyword in text:
+                return reply.model_copy(deep=True)
+        return super()._reply(messages)
+
+
+def make_fake_tool(name: str = "lookup", latency: float = 0.0) -> BaseTool:
+    """Creates a single-argument tool that sleeps for `latency` seconds and echoes its input"""
+
+    def run(query: str) -> str:
+        if latency:
+            time.sleep(latency)
+        return f"{name} result for {query}"
+
+    async def arun(query: str) -> str:
+        if latency:
+            await asyncio.sleep(latency)
+        return f"{name} result for {query}"
+
+    return StructuredTool.from_function(
+        func=run, coroutine=arun, name=name, description=f"Looks up information ({name})."
+    )
+
+
+# Words that appear everywhere and would make every text look alike
+STOP_WORDS = frozenset(
+    "a an and are as at be by can for from how in is it its of on or that the this to what which who with you".split()
+)
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic local embeddings: hashed word unigrams + bigrams, L2-normalized.
+
+    Not semantic like text-embedding-3, but texts that share words get similar vectors,
+    which is enough to compare chunking settings and search code without the network.
+    """
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> np.ndarray:
+        words = [word for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOP_WORDS]
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in features:
+            # crc32 instead of hash(): Python's hash() changes between processes
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dimensions] += 1.0 if (h >> 31) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text).tolist()
@@ -3,6 +3,8 @@ import os
 from langchain_core.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
 
+from cascade import CascadingChatModel, no_refusal, not_truncated
+
 load_dotenv()
 
 
@@ -24,9 +26,14 @@ Musk was the largest donor in the 2024 U.S. presidential election, where he supp
         input_varibles=['information'],
         template = summary_template
     )
-    llm = ChatOpenAI(temperature=0,model="gpt-4o")
+    # gpt-4o-mini answers first, gpt-4o only gets the request when the summary is refused or cut off
+    llm = CascadingChatModel(
+        tiers=[ChatOpenAI(temperature=0,model="gpt-4o-mini"), ChatOpenAI(temperature=0,model="gpt-4o")],
+        checks=[no_refusal, not_truncated],
+    )
     chain = summary_prompt_template|llm
     response = chain.invoke({'information':information})
     print(response.content)
+    print(f"Answered by {response.response_metadata['cascade_tier']}")
 if __name__ == "__main__":
     main()
@@ -0,0 +1,244 @@
+import json
+import re
+from typing import List, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from langchain_core.utils.json import parse_json_markdown
+
+from schemas import AgentResponse, Source
+
+# --- CONCEPT: PARTIAL STRUCTURED OUTPUT ---
+# The model writes the AgentResponse as JSON, token by token:
+#   {"answer": "The best ...", "sources": [{"url": "https://..."}, ...]}
+# Instead of waiting for the closing "}", we scan the JSON as it arrives and hand out
+# AgentResponse objects that fill up over time: the answer text grows first,
+# then every source is added (validated, normalized, deduplicated) the moment its object closes.
+# ------------------------------------------
+
+# Query parameters that only track clicks and never change the page
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "trk", "refid")
+
+URL_PATTERN = re.compile(r"https?://[^\s)\]}>\"']+")
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL, so the same page cited twice is only listed once"""
+    url = url.strip()
+    parts = urlsplit(url)
+    if not parts.netloc:
+        # "www.linkedin.com/jobs/1" has no scheme and would be parsed as a path
+        parts = urlsplit(f"https://{url}")
+
+    netloc = parts.netloc.lower()
+    if netloc.endswith(":80") or netloc.endswith(":443"):
+        netloc = netloc.rsplit(":", 1)[0]
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    ]
+    # The fragment only scrolls within the page, so it is dropped too
+    return urlunsplit(
+        ((parts.scheme or "https").lower(), netloc, parts.path.rstrip("/"), urlencode(query), "")
+    )
+
+
+def fallback_agent_response(text: str) -> AgentResponse:
+    """Best-effort AgentResponse from a final answer that did not match the schema."""
+    try:
+        # Handles ```json fences and JSON that was cut off before the closing brace
+        return AgentResponse.model_validate(parse_json_markdown(text))
+    except Exception:
+        pass
+    # Not JSON at all: keep the text as the answer and collect the links it mentions
+    urls = dict.fromkeys(normalize_url(url.rstrip(".,;:!?")) for url in URL_PATTERN.findall(text))
+    return AgentResponse(answer=text.strip(), sources=[Source(url=url) for url in urls])
+
+
+class AgentResponseStreamParser:
+    """Incremental parser for the JSON of an AgentResponse.
+
+    Every character is looked at once: a small state machine tracks strings and nesting,
+    and only the new part of the answer is decoded, so feed() scans and decodes O(len(chunk))
+    no matter how long the response already is. A snapshot still hands out the whole answer
+    string, which costs one copy of it.
+    """
+
+    # Longest escape that can still be incomplete at the end of a chunk: "\ud83d\ude0" (11 chars)
+    MAX_PENDING_ESCAPE = 11
+
+    def __init__(self):
+        self._chunks: List[str] = []  # the raw text, only joined once in result()
+        self._started = False
+
+        # JSON scanner state
+        self._stack: List[str] = []  # open containers, "{" or "["
+        self._in_string = False
+        self._escaped = False
+        self._expect_key = False  # inside an object, the next string is a key
+        self._is_key = False
+        self._key: Optional[str] = None  # last key seen in the top-level object
+        # Raw text of a key / source object that started in an earlier chunk
+        self._key_parts: Optional[List[str]] = None
+        self._source_parts: Optional[List[str]] = None
+
+        # The answer string: decoded prefix + raw tail that may end in half an escape
+        self._in_answer = False
+        self._answer = ""
+        self._answer_pending = ""
+
+        # What has been parsed so far
+        self.sources: List[Source] = []
+        self._seen_urls: Set[str] = set()
+
+    def feed(self, chunk: str) -> Optional[AgentResponse]:
+        """Consume the next piece of JSON, return a new snapshot if something was added"""
+        answer_before, sources_before = len(self._answer), len(self.sources)
+        self._chunks.append(chunk)
+        self._scan(chunk)
+        if len(self._answer) == answer_before and len(self.sources) == sources_before:
+            return None
+        return self.snapshot()
+
+    def snapshot(self) -> AgentResponse:
+        # model_construct skips validation of the (still growing) answer, the sources are already validated
+        return AgentResponse.model_construct(answer=self.answer, sources=list(self.sources))
+
+    def result(self) -> AgentResponse:
+        """The complete response, fully validated.
+
+        JSON that is cut off or does not match the schema keeps what the stream already
+        extracted (answer and valid sources). Only a response without any JSON object is
+        repaired with fallback_agent_response().
+        """
+        text = "".join(self._chunks)
+        if not self._started:
+            response = fallback_agent_response(text)
+        else:
+            try:
+                data, _ = json.JSONDecoder().raw_decode(text, text.index("{"))
+                response = AgentResponse.model_validate(data)
+            except ValueError:  # also covers pydantic's ValidationError
+                response = AgentResponse(answer=self.answer, sources=list(self.sources))
+        # Same normalization and de-duplication as during streaming
+        response.sources = self._dedupe(response.sources)
+        return response
+
+    @property
+    def answer(self) -> str:
+        return self._answer
+
+    def _append_answer(self, raw: str, complete: bool = False) -> None:
+        """Decodes the raw answer text up to the last complete escape sequence"""
+        raw = self._answer_pending + raw
+        decodable = raw
+        while decodable:
+            try:
+                decoded = json.loads(f'"{decodable}"', strict=False)
+            except json.JSONDecodeError:
+                # The chunk may end in the middle of an escape sequence like \n or \u00e9
+                cut = decodable.rfind("\\")
+                if complete or cut == -1 or len(raw) - cut > self.MAX_PENDING_ESCAPE:
+                    decoded, decodable = raw, raw  # not a cut-off escape, keep the text as it is
+                    break
+                decodable = decodable[:cut]
+                continue
+            # ...or between the two halves of a surrogate pair (emoji are sent as \ud83d\ude00)
+            if decoded and "\ud800" <= decoded[-1] <= "\udbff" and not complete:
+                decodable = decodable[:decodable.rfind("\\")]
+                continue
+            break
+        else:
+            decoded = ""
+        self._answer += decoded
+        self._answer_pending = "" if complete else raw[len(decodable):]
+
+    def _dedupe(self, sources: List[Source]) -> List[Source]:
+        unique, seen = [], set()
+        for source in sources:
+            url = normalize_url(source.url)
+            if url not in seen:
+                seen.add(url)
+                unique.append(Source(url=url))
+        return unique
+
+    def _add_source(self, raw: str) -> None:
+        try:
+            source = Source.model_validate(json.loads(raw))
+        except ValueError:
+            return  # an invalid source is skipped, result() will report it
+        url = normalize_url(source.url)
+        if url not in self._seen_urls:
+            self._seen_urls.add(url)
+            self.sources.append(Source(url=url))
+
+    def _scan(self, chunk: str) -> None:
+        if self._started and not self._stack:
+            return  # the response object is closed, anything after it is ignored
+        i = 0
+        if not self._started:
+            # Skip anything the model wrote before the JSON object starts
+            i = chunk.find("{")
+            if i == -1:
+                return
+            self._started = True
+
+        # Where the key / answer / source that is still open starts in this chunk
+        string_start = source_start = 0
+        while i < len(chunk):
+            char = chunk[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._close_string(chunk[string_start:i])
+            elif char == '"':
+                self._in_string = True
+                string_start = i + 1
+                self._is_key = self._expect_key
+                if len(self._stack) == 1:
+                    if self._is_key:
+                        self._key_parts = []
+                    elif self._key == "answer":
+                        self._in_answer = True
+            elif char == "{":
+                if len(self._stack) == 2 and self._stack[-1] == "[" and self._key == "sources":
+                    self._source_parts = []
+                    source_start = i
+                self._stack.append("{")
+                self._expect_key = True
+            elif char == "[":
+                self._stack.append("[")
+                self._expect_key = False
+            elif char in "}]":
+                self._stack.pop()
+                if char == "}" and len(self._stack) == 2 and self._source_parts is not None:
+                    self._add_source("".join(self._source_parts) + chunk[source_start:i + 1])
+                    self._source_parts = None
+                self._expect_key = False
+                if not self._stack:
+                    return
+            elif char == ",":
+                self._expect_key = bool(self._stack) and self._stack[-1] == "{"
+            elif char == ":":
+                self._expect_key = False
+            i += 1
+
+        # Carry the unfinished pieces over to the next chunk
+        if self._key_parts is not None:
+            self._key_parts.append(chunk[string_start:])
+        if self._in_answer:
+            self._append_answer(chunk[string_start:])
+        if self._source_parts is not None:
+            self._source_parts.append(chunk[source_start:])
+
+    def _close_string(self, tail: str) -> None:
+        self._in_string = False
+        if self._key_parts is not None:
+            self._key = json.loads(f'"{"".join(self._key_parts)}{tail}"')
+            self._key_parts = None
+        elif self._in_answer:
+            self._append_answer(tail, complete=True)
+            self._in_answer = False